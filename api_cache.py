@@ -0,0 +1,256 @@
+"""
+    Persistent on-disk cache for Comic Vine API responses.
+
+    Responses are stored in a small SQLite database (stdlib `sqlite3`, independent
+    of the application's SQLAlchemy database) and keyed on the endpoint plus the
+    normalized request parameters, with the `api_key` removed so that rotating the
+    key does not invalidate the cache.
+
+    Features:
+        - Per-resource TTLs ('search', 'issues', 'issue').
+        - Negative caching of "not found" responses with a shorter TTL.
+        - Size-bounded LRU eviction based on the last access time of each entry.
+        - Invalidation by endpoint, and a global bypass via the
+          `COMIC_VINE_CACHE` environment variable ("off" disables the cache).
+
+    Environment variables:
+        - COMIC_VINE_CACHE: Set to "off" to bypass the cache entirely.
+        - COMIC_VINE_CACHE_PATH: Location of the cache database file.
+        - COMIC_VINE_CACHE_MAX_ENTRIES: Maximum number of cached responses.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+
+# Time-to-live, in seconds, for each Comic Vine resource.
+DEFAULT_TTLS = {
+    'search': 7 * 24 * 3600,   # Volume searches rarely change.
+    'issues': 24 * 3600,       # Ongoing volumes gain new issues.
+    'issue': 30 * 24 * 3600,   # Issue details are effectively static.
+}
+DEFAULT_TTL = 24 * 3600
+NEGATIVE_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 50000
+
+# Parameters that must never be part of a cache key.
+_EXCLUDED_PARAMS = {'api_key'}
+
+
+def resource_for_url(url):
+    """
+    Derive the Comic Vine resource name from an endpoint URL.
+
+    Args:
+        url (str): Endpoint URL (e.g. ".../api/issue/4000-123/").
+
+    Returns:
+        str: The resource name ('search', 'issues', 'issue', ...).
+    """
+    path = urllib.parse.urlparse(url).path.rstrip('/')
+    segment = path.rsplit('/', 1)[-1]
+    # Detail endpoints look like "issue/4000-123"; use the parent segment.
+    if '-' in segment and segment.split('-', 1)[0].isdigit():
+        segment = path.rsplit('/', 2)[-2]
+    return segment
+
+
+def make_cache_key(url, params):
+    """
+    Build a stable cache key from an endpoint and its parameters.
+
+    Args:
+        url (str): The endpoint URL.
+        params (dict): Request parameters; `api_key` is ignored.
+
+    Returns:
+        str: The normalized cache key.
+    """
+    items = sorted(
+        (str(key), str(value))
+        for key, value in (params or {}).items()
+        if key not in _EXCLUDED_PARAMS
+    )
+    return f"{url.rstrip('/')}/?{urllib.parse.urlencode(items)}"
+
+
+def is_negative_response(data):
+    """
+    Check whether an API response means "not found".
+
+    Comic Vine answers unknown objects with status code 101 and searches without
+    matches with an empty result list.
+
+    Args:
+        data (dict): Decoded JSON response.
+
+    Returns:
+        bool: True if the response carries no usable results.
+    """
+    return data.get('status_code') == 101 or not data.get('results')
+
+
+class ApiCache:
+    """
+    SQLite-backed response cache with per-resource TTLs and LRU eviction.
+
+    The cache is safe to share across threads; all access goes through a single
+    connection guarded by a lock.
+
+    Attributes:
+        path (str): Location of the cache database file.
+        ttls (dict): TTL in seconds for each resource name.
+        negative_ttl (int): TTL in seconds for "not found" responses.
+        max_entries (int): Maximum number of entries kept before eviction.
+        enabled (bool): When False, `get` always misses and `set` is a no-op.
+    """
+
+    def __init__(self, path, ttls=None, negative_ttl=NEGATIVE_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES, enabled=True):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+        self._entry_count = None
+
+    def _connection(self):
+        """Open the cache database on first use and create its schema."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            # The cache is rebuildable, so trade durability for speed.
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY,'
+                ' resource TEXT NOT NULL,'
+                ' body TEXT NOT NULL,'
+                ' negative INTEGER NOT NULL DEFAULT 0,'
+                ' expires_at REAL NOT NULL,'
+                ' last_access REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_responses_last_access ON responses (last_access)')
+            self._entry_count = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def get(self, url, params):
+        """
+        Look up a cached response.
+
+        Args:
+            url (str): The endpoint URL.
+            params (dict): The request parameters.
+
+        Returns:
+            dict: The cached JSON response, or None on a miss or expired entry.
+        """
+        if not self.enabled:
+            return None
+        key = make_cache_key(url, params)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute('SELECT body, expires_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            body, expires_at = row
+            if expires_at < now:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._entry_count -= 1
+                return None
+            conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+        return json.loads(body)
+
+    def set(self, url, params, data):
+        """
+        Store a response, applying the resource TTL or the negative TTL.
+
+        Args:
+            url (str): The endpoint URL.
+            params (dict): The request parameters.
+            data (dict): The decoded JSON response.
+        """
+        if not self.enabled or data is None:
+            return
+        resource = resource_for_url(url)
+        negative = is_negative_response(data)
+        ttl = self.ttls.get(resource, DEFAULT_TTL)
+        if negative:
+            ttl = min(ttl, self.negative_ttl)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                'INSERT OR REPLACE INTO responses (key, resource, body, negative, expires_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (make_cache_key(url, params), resource, json.dumps(data), int(negative), now + ttl, now)
+            )
+            # INSERT OR REPLACE reports one changed row either way; recount lazily on eviction.
+            self._entry_count += cursor.rowcount
+            if self._entry_count > self.max_entries:
+                self._evict(conn)
+
+    def _evict(self, conn):
+        """Drop expired entries, then the least recently used ones beyond the bound."""
+        conn.execute('DELETE FROM responses WHERE expires_at < ?', (time.time(),))
+        count = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        if count > self.max_entries:
+            # Evict an extra 10% so eviction does not run on every insert.
+            excess = count - int(self.max_entries * 0.9)
+            conn.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY last_access LIMIT ?)',
+                (excess,)
+            )
+            count -= excess
+        self._entry_count = count
+
+    def invalidate(self, url=None, params=None):
+        """
+        Remove cached responses.
+
+        Args:
+            url (str, optional): Endpoint URL to invalidate. When omitted, the whole
+                cache is cleared.
+            params (dict, optional): When given together with `url`, only that exact
+                request is invalidated; otherwise every request to `url` is.
+        """
+        with self._lock:
+            conn = self._connection()
+            if url is None:
+                conn.execute('DELETE FROM responses')
+            elif params is not None:
+                conn.execute('DELETE FROM responses WHERE key = ?', (make_cache_key(url, params),))
+            else:
+                prefix = f"{url.rstrip('/')}/?"
+                conn.execute('DELETE FROM responses WHERE substr(key, 1, ?) = ?', (len(prefix), prefix))
+            self._entry_count = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def clear(self):
+        """Remove every cached response."""
+        self.invalidate()
+
+
+def cache_from_env():
+    """
+    Create the default cache from environment variables.
+
+    Returns:
+        ApiCache: The configured cache instance.
+    """
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'comicvine_cache.db')
+    return ApiCache(
+        path=os.getenv('COMIC_VINE_CACHE_PATH', default_path),
+        max_entries=int(os.getenv('COMIC_VINE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+        enabled=os.getenv('COMIC_VINE_CACHE', 'on').lower() not in ('off', '0', 'false'),
+    )
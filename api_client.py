@@ -1,157 +1,376 @@
+import logging
 import urllib.parse
-import urllib.request
-import urllib.error
-import json
 import os
+import threading
 from dotenv import load_dotenv
-import time
+import requests
 
-api_rate_limit_reached = False
+from api_cache import cache_from_env, resource_for_url
+from http_client import http_client_from_env
+from metrics import API_CACHE, record_api_call
+from normalize import normalize_issue_number, normalize_title
+from rate_limit import RateLimitExceeded, rate_limiter_from_env
+from volume_index import rank_volumes, volume_index_from_env
+
+logger = logging.getLogger(__name__)
 
 # Load the API key
 load_dotenv()
 COMIC_VINE_API_KEY = os.getenv("COMIC_VINE_API_KEY")
-COMIC_VINE_BASE_URL = "https://comicvine.gamespot.com/api"
+# Overridable so imports can run against a local stand-in (benchmarks/fake_comicvine.py)
+COMIC_VINE_BASE_URL = os.getenv("COMIC_VINE_BASE_URL", "https://comicvine.gamespot.com/api").rstrip('/')
+
+# Persistent response cache shared by every lookup
+api_cache = cache_from_env()
+
+# Volumes seen in earlier searches, matched by normalized title and year
+volume_index = volume_index_from_env()
+
+# Per-resource hourly and velocity limits shared by every thread
+rate_limiter = rate_limiter_from_env()
+
+# Pooled keep-alive connections, safe to share across threads
+http_client = http_client_from_env()
+http_client.listeners.append(
+    lambda url, status, latency, size: record_api_call(resource_for_url(url), status, latency))
+
+# Only request the fields the lookups actually use; full issue documents carry
+# large HTML descriptions and credit lists.
+SEARCH_FIELDS = 'id,name,start_year'
+ISSUE_LIST_FIELDS = 'id,issue_number,name,image'
+ISSUE_DETAIL_FIELDS = 'id,name,image'
+
+def redact_url(url, params):
+    """
+    Build the full request URL with the API key masked, for logging.
 
-def make_api_call(url, params):
+    Args:
+        url (str): The endpoint URL.
+        params (dict): The request parameters.
+
+    Returns:
+        str: The URL with its query string, with `api_key` replaced by "REDACTED".
+    """
+    redacted = {key: ('REDACTED' if key == 'api_key' else value) for key, value in params.items()}
+    return f"{url}?{urllib.parse.urlencode(redacted)}"
+
+def make_api_call(url, params, use_cache=True, budget=None):
     """
-    Make an API call using urllib.
+    Make an API call over the pooled HTTP client, serving repeated requests from the
+    response cache.
+
+    Transient errors (5xx, timeouts, dropped connections) are retried with backoff
+    by the HTTP client before this function gives up and returns None.
 
     Args:
         url (str): The base URL for the API call.
         params (dict): The parameters for the API call.
+        use_cache (bool): Read from and write to the response cache. Pass False to
+            force a fresh request (the fresh response is not cached either).
+        budget (ComicVineRateLimiter, optional): An additional limiter that must
+            also allow the call, e.g. the prefetcher's own share of the quota.
+            Cache hits do not use it.
 
     Returns:
         dict: The JSON response from the API or None if an error occurs.
+
+    Raises:
+        RateLimitExceeded: If the API answered HTTP 420, or the client-side rate
+            limiter refuses the call. Further calls are suspended for an hour.
     """
-    global api_rate_limit_reached
+    resource = resource_for_url(url)
+    if use_cache:
+        cached = api_cache.get(url, params)
+        API_CACHE.inc(resource=resource, result='miss' if cached is None else 'hit')
+        if cached is not None:
+            return cached
+
+    def acquire():
+        # Blocks for the velocity limit; raises once the hourly quota is spent.
+        # Called again before every retry, since each one is a request to the API.
+        if budget is not None:
+            budget.acquire(resource)
+        rate_limiter.acquire(resource)
+
+    # Log the request URL without the API key
+    logger.debug(f"API request: {redact_url(url, params)}")
 
-    if api_rate_limit_reached:
-        print("API rate limit reached. Skipping further API calls.")
+    try:
+        response = http_client.get(url, params=params, acquire=acquire)
+    except requests.RequestException as e:
+        # Connection errors quote the request URL, API key included
+        message = str(e).replace(COMIC_VINE_API_KEY, 'REDACTED') if COMIC_VINE_API_KEY else str(e)
+        print(f"Error during API call: {message}")
         return None
 
-    # Encode parameters into the URL
-    query_string = urllib.parse.urlencode(params)
-    full_url = f"{url}?{query_string}"
-
-    # Print the final API request URL
-    print(f"API Request URL: {full_url}")
+    if response.status_code == 420:  # Handle rate-limiting error
+        print("Comic Vine API hourly limit reached. Stopping further API calls.")
+        rate_limiter.block()  # Suspend calls until the hourly window resets
+        raise RateLimitExceeded("Comic Vine API returned HTTP 420.")
+    if response.status_code != 200:
+        print(f"HTTP Error {response.status_code}: {response.reason}")
+        return None
 
     try:
-        with urllib.request.urlopen(full_url) as response:
-            if response.status != 200:
-                print(f"Error: HTTP Status {response.status}")
-                return None
-            data = response.read()
-            return json.loads(data)
-    except urllib.error.HTTPError as e:
-        if e.code == 420:  # Handle rate-limiting error
-            print("Comic Vine API hourly limit reached. Stopping further API calls.")
-            api_rate_limit_reached = True  # Set the flag to stop future calls
-        else:
-            print(f"HTTP Error {e.code}: {e.reason}")
-        return None
-    except Exception as e:
-        print(f"Error during API call: {e}")
+        data = response.json()
+    except ValueError as e:
+        print(f"Error decoding API response: {e}")
         return None
 
-def get_comic_issue_details(series_name, start_year, issue_number):
+    if use_cache:
+        api_cache.set(url, params, data)
+    return data
+
+class ComicVineResolver:
+    """
+    Resolve (series, start year, issue number) to Comic Vine issue details.
+
+    The resolver memoizes the expensive parts of a lookup so that an import only
+    pays for them once:
+        - Each (series name, start year) pair is searched a single time and mapped
+          to its volume id (misses are remembered as well). Series names are
+          normalized first, and volumes seen in earlier searches are answered from
+          the local `volume_index` without searching again.
+        - Each volume's issue list is paged through a single time and kept as an
+          normalized issue_number -> issue summary dict, so later lookups in the same volume
+          are O(1) dict hits with no HTTP calls. The summaries already carry the
+          issue name and image, so the per-issue detail call is normally skipped.
+
+    Keep one resolver alive for the duration of an import and pass it to
+    `get_comic_issue_details`. The resolver is safe to share across threads;
+    concurrent lookups of the same series or volume wait for a single fetch.
+
+    Attributes:
+        budget (ComicVineRateLimiter): Extra limiter applied to every call the
+            resolver makes, or None (see `make_api_call`).
+        volume_ids (dict): Maps (normalized series name, start year) to a volume id
+            or None.
+        issue_indexes (dict): Maps a volume id to its normalized issue_number ->
+            summary dict.
     """
-    Retrieve details about a specific comic issue using the Comic Vine API.
 
-    Args:
-        series_name (str): The name of the comic series.
-        start_year (int): The year the series started.
-        issue_number (str): The issue number to find.
+    page_size = 100
+    # Search results are ordered by relevance; matches beyond a few pages are
+    # not worth the extra calls
+    max_search_pages = 3
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.volume_ids = {}
+        self.issue_indexes = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, key):
+        """Return the lock serializing fetches for a series or volume key."""
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def resolve_volume(self, series_name, start_year):
+        """
+        Find the Comic Vine volume id for a series, searching at most once per series.
+
+        The local volume index is consulted first and answers only exact matches
+        (normalized title and start year); anything else is searched.
+
+        Args:
+            series_name (str): The name of the comic series.
+            start_year (int): The year the series started.
+
+        Returns:
+            int: The volume id, or None if no matching volume exists.
+        """
+        key = (normalize_title(series_name), str(start_year))
+        if key in self.volume_ids:
+            return self.volume_ids[key]
+
+        with self._lock_for(key):
+            if key in self.volume_ids:
+                return self.volume_ids[key]
+
+            known = volume_index.find(series_name, start_year)
+            if known:
+                self.volume_ids[key] = known[0][1]['id']
+                return self.volume_ids[key]
+            return self._search_volume(key, series_name, start_year)
+
+    def _search_volume(self, key, series_name, start_year):
+        """
+        Page through the volume search results, rank them and memoize the best match.
+
+        Paging stops at the first exact match (normalized title and start year) or
+        after `max_search_pages`. Without a close enough title, the first result
+        with the exact start year is used, as Comic Vine ranks results by relevance.
+        """
+        series_search_url = f"{COMIC_VINE_BASE_URL}/search/"
+        offset = 0
+        candidates = []
+
+        for _ in range(self.max_search_pages):
+            params = {
+                'api_key': COMIC_VINE_API_KEY,
+                'format': 'json',
+                'query': series_name.strip(),
+                'resources': 'volume',
+                'field_list': SEARCH_FIELDS,
+                'offset': offset,
+                'limit': self.page_size
+            }
+            series_data = make_api_call(series_search_url, params, budget=self.budget)
+            if not series_data:
+                # Do not memoize failed requests; a later call may succeed.
+                return None
 
-    Returns:
-        dict: Details about the specific comic issue or None if not found.
-    """
-    # Step 1: Search for the series with pagination
-    series_search_url = f"{COMIC_VINE_BASE_URL}/search/"
-    offset = 0
-    limit = 100
-    series_id = None
-
-    while True:
-        params = {
-            'api_key': COMIC_VINE_API_KEY,
-            'format': 'json',
-            'query': series_name,
-            'resources': 'volume',
-            'offset': offset,
-            'limit': limit
-        }
-        series_data = make_api_call(series_search_url, params)
-        if not series_data:
-            return None
+            results = series_data.get('results', [])
+            volume_index.add(results)
+            candidates.extend(results)
 
-        # Find the series by start year in the current page of results
-        for series in series_data.get('results', []):
-            if series.get('start_year') == str(start_year):
-                series_id = series['id']
+            # Stop at an exact match or when no more results are available
+            ranked = rank_volumes(series_name, start_year, candidates)
+            if (ranked and ranked[0][0] >= 1.0) or len(results) < self.page_size:
                 break
 
-        # If the series is found or no more results are available, break
-        if series_id or len(series_data.get('results', [])) < limit:
-            break
+            offset += self.page_size
+
+        if ranked:
+            series_id = ranked[0][1]['id']
+        else:
+            series_id = next(
+                (series['id'] for series in candidates if series.get('start_year') == str(start_year)), None)
+
+        if not series_id:
+            print(f"No series found for '{series_name}' starting in {start_year}.")
+
+        self.volume_ids[key] = series_id
+        return series_id
+
+    def issue_index(self, volume_id):
+        """
+        Fetch a volume's full issue list once and index it by issue number.
+
+        Args:
+            volume_id (int): The Comic Vine volume id.
+
+        Returns:
+            dict: Maps normalized issue numbers to issue summaries (id, name, image), or
+                None if a page could not be fetched.
+        """
+        if volume_id in self.issue_indexes:
+            return self.issue_indexes[volume_id]
+
+        with self._lock_for(('volume', volume_id)):
+            if volume_id in self.issue_indexes:
+                return self.issue_indexes[volume_id]
+            return self._fetch_issue_index(volume_id)
+
+    def _fetch_issue_index(self, volume_id):
+        """Page through a volume's issue list and memoize it by issue number."""
+        issues_url = f"{COMIC_VINE_BASE_URL}/issues/"
+        offset = 0
+        index = {}
+
+        while True:
+            params = {
+                'api_key': COMIC_VINE_API_KEY,
+                'format': 'json',
+                'filter': f'volume:{volume_id}',
+                'field_list': ISSUE_LIST_FIELDS,
+                'offset': offset,
+                'limit': self.page_size
+            }
+            issues_data = make_api_call(issues_url, params, budget=self.budget)
+            if not issues_data:
+                return None
+
+            results = issues_data.get('results', [])
+            for issue in results:
+                index.setdefault(normalize_issue_number(issue.get('issue_number')), issue)
 
-        offset += limit
+            # A full last page would otherwise cost one more, empty, request
+            total = issues_data.get('number_of_total_results')
+            if len(results) < self.page_size or (total is not None and offset + len(results) >= total):
+                break
 
-    if not series_id:
-        print(f"No series found for '{series_name}' starting in {start_year}.")
-        return None
+            offset += self.page_size
 
-    # Step 2: Get issues for the series with pagination
-    issues_url = f"{COMIC_VINE_BASE_URL}/issues/"
-    offset = 0
-    issue_id = None
-
-    while True:
-        params = {
-            'api_key': COMIC_VINE_API_KEY,
-            'format': 'json',
-            'filter': f'volume:{series_id}',
-            'offset': offset,
-            'limit': limit
-        }
-        issues_data = make_api_call(issues_url, params)
-        if not issues_data:
+        self.issue_indexes[volume_id] = index
+        return index
+
+    def get_issue_details(self, series_name, start_year, issue_number):
+        """
+        Retrieve details about a specific comic issue.
+
+        Args:
+            series_name (str): The name of the comic series.
+            start_year (int): The year the series started.
+            issue_number (str): The issue number to find.
+
+        Returns:
+            dict: Details about the specific comic issue or None if not found.
+
+        Raises:
+            RateLimitExceeded: If the Comic Vine rate limit is reached mid-lookup.
+        """
+        # Step 1: Resolve the series to a volume
+        series_id = self.resolve_volume(series_name, start_year)
+        if not series_id:
             return None
 
-        # Find the issue by issue number in the current page of results
-        for issue in issues_data.get('results', []):
-            if issue.get('issue_number') == str(issue_number):
-                issue_id = issue['id']
-                break
+        # Step 2: Look the issue up in the volume's issue index
+        index = self.issue_index(series_id)
+        if index is None:
+            return None
 
-        # If the issue is found or no more results are available, break
-        if issue_id or len(issues_data.get('results', [])) < limit:
-            break
+        issue_summary = index.get(normalize_issue_number(issue_number))
+        if not issue_summary:
+            print(f"Issue #{issue_number} not found in series '{series_name}' ({start_year}).")
+            return None
 
-        offset += limit
+        # Step 3: Get details for the specific issue, unless the listing already
+        # returned every field the detail call would (a null name stays null there).
+        if 'name' in issue_summary and 'image' in issue_summary:
+            issue_result = dict(issue_summary)
+        else:
+            issue_url = f"{COMIC_VINE_BASE_URL}/issue/4000-{issue_summary['id']}/"
+            params = {
+                'api_key': COMIC_VINE_API_KEY,
+                'format': 'json',
+                'field_list': ISSUE_DETAIL_FIELDS
+            }
+            issue_details = make_api_call(issue_url, params, budget=self.budget)
+
+            if not issue_details:
+                return None
+            issue_result = issue_details.get('results') or {}
 
-    if not issue_id:
-        print(f"Issue #{issue_number} not found in series '{series_name}' ({start_year}).")
-        return None
+        # Extract issue image
+        image_url = (issue_result.get('image') or {}).get('original_url', None)
+        issue_result['image_url'] = image_url
 
-    # Step 3: Get details for the specific issue
-    issue_url = f"{COMIC_VINE_BASE_URL}/issue/4000-{issue_id}/"
-    params = {
-        'api_key': COMIC_VINE_API_KEY,
-        'format': 'json'
-    }
-    issue_details = make_api_call(issue_url, params)
+        return issue_result
 
-    if not issue_details:
-        return None
 
-    # Extract issue image
-    issue_result = issue_details.get('results', {})
-    image_url = issue_result.get('image', {}).get('original_url', None)
-    issue_result['image_url'] = image_url
+def get_comic_issue_details(series_name, start_year, issue_number, resolver=None):
+    """
+    Retrieve details about a specific comic issue using the Comic Vine API.
 
-    return issue_result
+    Args:
+        series_name (str): The name of the comic series.
+        start_year (int): The year the series started.
+        issue_number (str): The issue number to find.
+        resolver (ComicVineResolver, optional): Resolver whose volume and issue
+            indexes are reused across calls. A throwaway resolver is used if omitted.
+
+    Returns:
+        dict: Details about the specific comic issue or None if not found or if the
+            API rate limit has been reached.
+    """
+    resolver = resolver or ComicVineResolver()
+    try:
+        return resolver.get_issue_details(series_name, start_year, issue_number)
+    except RateLimitExceeded:
+        print("API rate limit reached. Skipping further API calls.")
+        return None
 
 
 
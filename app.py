@@ -1,18 +1,33 @@
+import cProfile
+import gzip
+import io
 import os
+import pstats
+import time
+import uuid
 from collections import defaultdict
-from flask import Flask, render_template, redirect, request
+from flask import Flask, abort, g, make_response, redirect, render_template, request, send_from_directory, url_for
 from flask_wtf import FlaskForm
-from wtforms import FileField, SubmitField
+from wtforms import BooleanField, FileField, SubmitField
 from wtforms.validators import DataRequired
-from flask_wtf.csrf import CSRFProtect
+from flask_wtf.csrf import CSRFProtect, generate_csrf
 from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 import logging
 
-from database import db
-from models import Comic
-from import_data import import_comics
-from utils import get_comics_by_sorting
+from covers import COVERS_DIR
+from database import db, engine_options
+import metrics
+from metrics import HTTP_DB_QUERIES, HTTP_DB_SECONDS, HTTP_LATENCY, HTTP_REQUESTS, RENDER_SECONDS, query_tracker
+from models import Comic, ImportJob
+from migrations import upgrade_database
+from search import DEFAULT_LIMIT, MAX_LIMIT, search_comics
+from stats import get_collection_stats, has_comics
+from jobs import job_status, resume_unfinished_jobs, submit_import
+from prefetch import start_prefetcher
+from utils import STATUSES, get_comics_page, get_storyline_index, set_comics_status
+from view_cache import bump_data_version, sync_data_version, view_cache
 
 # Load environment variables
 load_dotenv()
@@ -22,12 +37,33 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'fallback-key')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///comics.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024  # 2MB limit
 
 # Initialize extensions
 db.init_app(app)
 csrf = CSRFProtect(app)
 
+# Covers are content-addressed, so browsers may keep them for a year
+COVER_MAX_AGE = 365 * 24 * 3600
+
+# Upper bound on the ids accepted by one batch status update
+MAX_BATCH_IDS = 1000
+
+# Comic fields exposed by /api/comics, in output order
+API_FIELDS = (
+    'id', 'issue', 'issue_number', 'issue_title', 'series_start_year', 'issue_published_year',
+    'tbp', 'availability', 'storyline', 'story_order', 'status', 'cover_image_url',
+)
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+
+# PROFILE_REQUESTS=on profiles every request and logs the slowest functions;
+# with profiling on (or in debug mode), add ?profile=1 to get the report instead
+# of the page.
+PROFILE_REQUESTS = os.getenv('PROFILE_REQUESTS', 'off').lower() in ('1', 'on', 'true')
+PROFILE_LINES = 30
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,15 +71,93 @@ logger = logging.getLogger(__name__)
 # WTForms Upload Form
 class UploadForm(FlaskForm):
     file = FileField('Upload CSV', validators=[DataRequired()])
+    prune = BooleanField('Remove comics that are not in this file')
     submit = SubmitField('Upload')
 
 def is_database_empty():
     """
-    Check if the database exists and contains any comics.
+    Check if the database contains any comics.
+
+    The answer comes from an EXISTS probe cached until the next write.
+
     Returns:
         bool: True if the database is empty, False otherwise.
     """
-    return os.path.exists(os.path.join(app.root_path, 'comics.db')) or Comic.query.count() == 0
+    return not has_comics()
+
+def cached_view(key, render):
+    """
+    Serve a rendered view from the versioned view cache.
+
+    The response carries an ETag and Last-Modified tied to the data version, so
+    browsers revalidate with If-None-Match / If-Modified-Since and get
+    `304 Not Modified` until an import or status change bumps the version.
+
+    Args:
+        key (tuple): Identifies the view and its arguments in the cache.
+        render (callable): Renders the HTML on a cache miss.
+
+    Returns:
+        Response: The (possibly 304) response.
+    """
+    # Read the validators before rendering so a concurrent write never pairs
+    # stale HTML with the new version's ETag.
+    etag = view_cache.etag()
+    last_modified = view_cache.last_modified
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(view_cache.get_or_set(key, lambda: _timed_render(key[0], render)))
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def _timed_render(view, render):
+    """Render a view, recording how long it took."""
+    with RENDER_SECONDS.time(view=view):
+        return render()
+
+def _profiling_requested():
+    return PROFILE_REQUESTS or (app.debug and request.args.get('profile') == '1')
+
+@app.before_request
+def start_request_metrics():
+    """Start timing the request and counting its SQL statements."""
+    g.request_started = time.perf_counter()
+    query_tracker.start()
+    if _profiling_requested():
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.before_request
+def refresh_data_version():
+    """Pick up committed writes, including those made by other processes such as the command-line importer."""
+    sync_data_version()
+
+@app.after_request
+def record_request_metrics(response):
+    """Record the request's latency and SQL usage, and attach or log its profile."""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        if request.args.get('profile') == '1':
+            response = make_response(report.getvalue())
+            response.mimetype = 'text/plain'
+        else:
+            logger.info(f"Profile of {request.method} {request.full_path}:\n{report.getvalue()}")
+
+    statements, db_seconds = query_tracker.stop()
+    endpoint = request.endpoint or 'unknown'
+    HTTP_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    # Requests rejected by an earlier hook (e.g. CSRF) never started the timer
+    if 'request_started' in g:
+        HTTP_LATENCY.observe(time.perf_counter() - g.request_started, endpoint=endpoint)
+        HTTP_DB_QUERIES.observe(statements, endpoint=endpoint)
+        HTTP_DB_SECONDS.observe(db_seconds, endpoint=endpoint)
+    return response
 
 # Routes
 @app.route('/comics')
@@ -52,24 +166,256 @@ def show_comics():
     """
     Display comics based on the selected sorting option.
 
+    The rendered page is cached per sorting option and page until the data
+    version changes.
+
     Args:
-        None directly, but accepts 'sort' as a query parameter to determine sorting behavior.
-        Options:
-            - 'storyline': Group comics by storyline (default).
-            - 'id': Sort comics by ID.
-            - 'year': Sort comics by publication year.
+        None directly, but accepts query parameters:
+            - 'sort': 'storyline' (default) renders a collapsed storyline index
+              whose cards are loaded on demand from /storyline_comics; 'id' renders
+              one page of comics sorted by ID.
+            - 'after': Keyset cursor of the page to show when sorting by ID.
 
     Returns:
-        Rendered HTML page displaying comics grouped or sorted based on the selected option.
+        Rendered HTML page displaying the storyline index or a page of comics.
     """
-    
+    # Retrieve sorting option from query parameters
+    sort_option = 'id' if request.args.get('sort') == 'id' else 'storyline'
+    after = request.args.get('after') if sort_option == 'id' else None
+    try:
+        return cached_view(('comics', sort_option, after), lambda: _render_comics(sort_option, after))
+    except ValueError:
+        return "Invalid page cursor.", 400
+
+def _render_comics(sort_option, after):
+    """Render the comics page for a sorting option and page cursor."""
     if is_database_empty():
-         return render_template('comics.html', database_empty=True)
+        return render_template('comics.html', database_empty=True)
 
-    # Retrieve sorting option from query parameters
-    sort_option = request.args.get('sort', 'storyline')
-    comics_by_storyline = get_comics_by_sorting(sort_option)
-    return render_template('comics.html', comics_by_storyline=comics_by_storyline, sort_option=sort_option)
+    stats = get_collection_stats()
+    if sort_option == 'id':
+        comics, next_cursor = get_comics_page('id', after=after)
+        return render_template('comics.html', comics=comics, next_cursor=next_cursor, sort_option=sort_option,
+                               stats=stats)
+
+    storylines = get_storyline_index()
+    return render_template('comics.html', storylines=storylines, sort_option=sort_option, stats=stats)
+
+@app.route('/storyline_comics')
+def storyline_comics():
+    """
+    Render one page of a storyline's comic cards as an HTML fragment.
+
+    Args:
+        None directly, but accepts query parameters:
+            - 'storyline': The storyline to show; omit it for comics without one.
+            - 'after': Keyset cursor returned by the previous fragment.
+
+    Returns:
+        HTML fragment with the comic cards and, if more remain, a "Load more"
+        button pointing at the next page.
+    """
+    storyline = request.args.get('storyline')
+    after = request.args.get('after')
+    try:
+        return cached_view(('storyline', storyline, after), lambda: _render_storyline(storyline, after))
+    except ValueError:
+        return "Invalid page cursor.", 400
+
+def _render_storyline(storyline, after):
+    """Render one page of a storyline's comic cards."""
+    comics, next_cursor = get_comics_page('storyline', storyline=storyline, after=after)
+    next_url = url_for('storyline_comics', storyline=storyline, after=next_cursor) if next_cursor else None
+    return render_template('_comic_cards.html', comics=comics, next_url=next_url)
+
+@app.route('/search')
+def search():
+    """
+    Full-text search over series, issue titles, storylines, TBP and availability.
+
+    Every word matches as a prefix ("spid ma" finds "Spider-Man") and results are
+    ranked by relevance. Results are cached per query until the data version
+    changes.
+
+    Args:
+        None directly, but accepts query parameters:
+            - 'q': The search text.
+            - 'limit': Maximum number of results (default 50, at most 200).
+            - 'status': Only return comics that are 'Read' or 'Unread'.
+            - 'format': 'json' to return JSON instead of HTML (also chosen when
+              the Accept header prefers JSON).
+
+    Returns:
+        Rendered HTML page with the matching comic cards, or JSON:
+        {"query": ..., "count": ..., "results": [...]}.
+    """
+    query = request.args.get('q', '').strip()
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    status = request.args.get('status')
+    if limit < 1:
+        return {"success": False, "message": "Limit must be positive."}, 400
+    limit = min(limit, MAX_LIMIT)
+    if status is not None and status not in STATUSES:
+        return {"success": False, "message": "Invalid status value."}, 400
+
+    wants_json = request.args.get('format') == 'json' or \
+        request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
+    if wants_json:
+        response = cached_view(('search_json', query, limit, status), lambda: _render_search_json(query, limit, status))
+        response.mimetype = 'application/json'
+    elif not query:
+        return redirect(url_for('show_comics'))
+    else:
+        response = cached_view(('search', query, limit, status), lambda: _render_search(query, limit, status))
+    response.vary.add('Accept')
+    return response
+
+def _render_search_json(query, limit, status):
+    """Serialize search results for the JSON API."""
+    results = [
+        {**row._asdict(), 'score': round(row.score, 4)}
+        for row in search_comics(query, limit, status)
+    ]
+    return app.json.dumps({"query": query, "count": len(results), "results": results})
+
+def _render_search(query, limit, status):
+    """Render the search results page."""
+    comics = search_comics(query, limit, status)
+    return render_template('comics.html', comics=comics, query=query, sort_option='search',
+                           stats=get_collection_stats())
+
+@app.route('/api/comics')
+def api_comics():
+    """
+    Read the collection as compact JSON, one keyset page at a time.
+
+    Responses carry the same data-version ETag as the HTML views, so clients
+    polling with If-None-Match get `304 Not Modified` until an import or status
+    change. Bodies are gzip-compressed for clients that accept it, and cached
+    per query until the data version changes.
+
+    Args:
+        None directly, but accepts query parameters:
+            - 'fields': Comma-separated fields to return, e.g. "id,issue,status"
+              (default: every field in `API_FIELDS`).
+            - 'storyline': Only comics of this storyline, in story order; an
+              empty value selects comics without a storyline. Without it, comics
+              are ordered by ID.
+            - 'status': Only comics that are 'Read' or 'Unread'.
+            - 'after': The `next_cursor` of the previous page.
+            - 'limit': Comics per page (default 100, at most 1000).
+
+    Returns:
+        JSON response: {"comics": [...], "count": ..., "next_cursor": ...} where
+        `next_cursor` is null on the last page, or 400 for invalid parameters.
+    """
+    fields = tuple(dict.fromkeys(
+        field.strip() for field in request.args.get('fields', ','.join(API_FIELDS)).split(',') if field.strip()
+    ))
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if not fields or unknown:
+        return {"success": False, "message": f"Invalid fields: {', '.join(unknown)}. "
+                                             f"Valid fields: {', '.join(API_FIELDS)}."}, 400
+    status = request.args.get('status')
+    if status is not None and status not in STATUSES:
+        return {"success": False, "message": "Invalid status value."}, 400
+    limit = request.args.get('limit', API_PAGE_SIZE, type=int)
+    if not 1 <= limit <= API_MAX_PAGE_SIZE:
+        return {"success": False, "message": f"Limit must be between 1 and {API_MAX_PAGE_SIZE}."}, 400
+
+    storyline = request.args.get('storyline')
+    sort_option = 'id' if storyline is None else 'storyline'
+    storyline = storyline or None
+    after = request.args.get('after')
+    gzipped = 'gzip' in request.accept_encodings
+
+    key = ('api_comics', fields, sort_option, storyline, status, after, limit, gzipped)
+    try:
+        response = cached_view(key, lambda: _render_api_comics(fields, sort_option, storyline, status, after, limit,
+                                                               gzipped))
+    except ValueError:
+        return {"success": False, "message": "Invalid page cursor."}, 400
+    response.mimetype = 'application/json'
+    response.vary.add('Accept-Encoding')
+    if gzipped and response.status_code == 200:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def _render_api_comics(fields, sort_option, storyline, status, after, limit, gzipped):
+    """Serialize one page of comics for the JSON API, gzip-compressed if requested."""
+    columns = tuple(getattr(Comic, field) for field in fields)
+    comics, next_cursor = get_comics_page(sort_option, storyline=storyline, after=after, limit=limit, status=status,
+                                          columns=columns)
+    body = app.json.dumps(
+        {"comics": [{field: getattr(comic, field) for field in fields} for comic in comics],
+         "count": len(comics), "next_cursor": next_cursor},
+        separators=(',', ':'), sort_keys=False,
+    ).encode('utf-8')
+    return gzip.compress(body) if gzipped else body
+
+@app.route('/stats')
+def show_stats():
+    """
+    Report collection totals.
+
+    Returns:
+        JSON response: {"total": ..., "read": ..., "unread": ..., "storylines": ...}.
+    """
+    return get_collection_stats(), 200
+
+@app.route('/metrics')
+def show_metrics():
+    """
+    Expose counters and latency histograms in the Prometheus text format.
+
+    Returns:
+        Plain-text metrics for API calls, cache hits, requests, SQL statements,
+        render times and import throughput.
+    """
+    response = make_response(metrics.render())
+    response.headers['Content-Type'] = metrics.CONTENT_TYPE
+    response.cache_control.no_store = True
+    return response
+
+@app.route('/covers/<int:comic_id>')
+def show_cover(comic_id):
+    """
+    Serve a comic's locally cached cover.
+
+    Cover files are content-addressed, and pages link to them with the file's hash
+    in the `v` query parameter, so responses can be cached for a year.
+
+    Args:
+        comic_id (int): The ID of the comic.
+        size (str, query parameter): 'thumb' (default) or 'original'.
+
+    Returns:
+        The image file, or 404 if the cover has not been cached yet.
+    """
+    comic = db.session.get(Comic, comic_id)
+    if not comic or not comic.cover_thumb_path:
+        abort(404)
+
+    path = comic.cover_path if request.args.get('size') == 'original' else comic.cover_thumb_path
+    response = send_from_directory(COVERS_DIR, path, max_age=COVER_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/csrf_token')
+def get_csrf_token():
+    """
+    Issue a CSRF token for JavaScript requests.
+
+    Cached pages are shared between visitors, so the token is fetched separately
+    instead of being rendered into the page.
+
+    Returns:
+        JSON response: {"csrf_token": "..."}.
+    """
+    response = make_response({"csrf_token": generate_csrf()})
+    response.cache_control.no_store = True
+    return response
 
 @app.route('/update_status/<int:comic_id>', methods=['POST'])
 def update_status(comic_id):
@@ -91,6 +437,7 @@ def update_status(comic_id):
 
         # Toggle status
         comic.status = "Read" if comic.status == "Unread" else "Unread"
+        bump_data_version()
         db.session.commit()
         return {"success": True, "status": comic.status}, 200
     except SQLAlchemyError as e:
@@ -98,20 +445,69 @@ def update_status(comic_id):
         return {"success": False, "error": str(e)}, 500
 
 
+@app.route('/update_status/batch', methods=['POST'])
+def update_status_batch():
+    """
+    Set the status of several comics, or of a whole storyline, at once.
+
+    All matching comics are updated by a single UPDATE statement in one
+    transaction, instead of one request and one commit per comic.
+
+    Args:
+        None directly, but expects a JSON body with:
+            - 'status': "Read" or "Unread".
+            - 'ids': List of comic IDs to update, or
+            - 'storyline': The storyline whose comics are all updated; null
+              selects comics without a storyline.
+
+    Returns:
+        JSON response:
+            - {"success": True, "status": ..., "updated": count} (on success).
+            - {"success": False, "error": "Error message"} (on failure).
+    """
+    data = request.get_json(silent=True) or {}
+    status = data.get('status')
+    if status not in STATUSES:
+        return {"success": False, "error": "Status must be 'Read' or 'Unread'"}, 400
+
+    ids = data.get('ids')
+    if ids is not None:
+        # bool is a subclass of int, but [true] must not update comic 1
+        if not isinstance(ids, list) or not all(type(comic_id) is int for comic_id in ids):
+            return {"success": False, "error": "ids must be a list of integers"}, 400
+        if len(ids) > MAX_BATCH_IDS:
+            return {"success": False, "error": f"At most {MAX_BATCH_IDS} ids per request"}, 400
+    elif 'storyline' not in data:
+        return {"success": False, "error": "Provide either ids or storyline"}, 400
+
+    try:
+        updated = set_comics_status(status, ids=ids, storyline=data.get('storyline'))
+        if updated:
+            bump_data_version()
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return {"success": False, "error": str(e)}, 500
+
+    return {"success": True, "status": status, "updated": updated}, 200
+
+
 @app.route('/upload', methods=['GET', 'POST'])
 def upload_comics():
     """
     Handle file uploads for importing comics into the database.
 
-    Processes uploaded CSV files to add or update comics in the database.
+    Saves uploaded CSV files and queues them for import in the background.
 
     Args:
-        None directly, but expects a POST request with a CSV file.
+        None directly, but expects a POST request with a CSV file and an optional
+        'prune' checkbox to remove comics that are not in the file.
 
     Returns:
-        Rendered HTML page:
-            - Redirect to '/' on success.
-            - Error message on invalid file format or upload failure.
+        - JSON response {"job_id": ..., "status_url": ...} with status 202 once
+          the import is queued; poll the status URL for progress.
+        - Error message on invalid file format or upload failure.
+        - Rendered upload page for GET requests.
     """
     form = UploadForm()
     if form.validate_on_submit():
@@ -119,17 +515,40 @@ def upload_comics():
         if not file.filename.endswith('.csv'):
             return "Invalid file format. Please upload a CSV.", 400
 
-        filepath = os.path.join(app.root_path, 'uploads', file.filename)
+        # A unique name per upload, so a same-named file never replaces the one
+        # a queued or running job is still reading
+        filename = secure_filename(file.filename) or 'upload.csv'
+        filepath = os.path.join(app.root_path, 'uploads', f'{uuid.uuid4().hex}_{filename}')
         try:
             file.save(filepath)
-            import_comics(filepath)
-            return redirect('/')
+            job_id = submit_import(app, filepath, prune=form.prune.data, filename=filename)
+            return {"job_id": job_id, "status_url": url_for('show_job', job_id=job_id)}, 202
         except Exception as e:
             logger.error(f"Error during file upload or import: {e}")
+            # No job owns the file, so nothing else would delete it
+            if os.path.exists(filepath):
+                os.remove(filepath)
             return "An error occurred during file upload or import.", 500
 
     return render_template('upload.html', form=form)
 
+@app.route('/jobs/<int:job_id>')
+def show_job(job_id):
+    """
+    Report the progress of a background import job.
+
+    Args:
+        job_id (int): The id returned by the upload.
+
+    Returns:
+        JSON response with the job status, rows parsed/enriched/written, API calls
+        made and the estimated seconds remaining, or 404 if the job is unknown.
+    """
+    job = db.session.get(ImportJob, job_id)
+    if not job:
+        return {"error": "Job not found"}, 404
+    return job_status(job), 200
+
 @app.errorhandler(404)
 def not_found_error(error):
     return render_template('404.html'), 404
@@ -143,5 +562,12 @@ def internal_error(error):
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        upgrade_database()
         logger.info("Database initialized.")
+    # The debug reloader runs this block in a watcher process and again in the
+    # serving child; only the child (WERKZEUG_RUN_MAIN set) runs background work.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        with app.app_context():
+            resume_unfinished_jobs(app)
+        start_prefetcher(app)
     app.run(debug=True)
@@ -0,0 +1,155 @@
+"""
+    Measure read and status-toggle latency while an import is writing.
+
+    A database is seeded with comics, then a large CSV import runs in one
+    transaction while reader threads keep building the storyline index and the
+    first page of comics, and a toggler thread keeps flipping single comics to
+    "Read". The latency percentiles and the number of "database is locked"
+    failures are reported for each.
+
+    Run it twice to compare the tuned connection settings with SQLite's defaults:
+
+        python benchmarks/bench_concurrency.py
+        python benchmarks/bench_concurrency.py --baseline
+
+    Comic Vine is never contacted; enrichment is disabled for the run.
+"""
+
+import argparse
+import csv
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+
+import api_client
+import database
+from database import db, engine_options
+from import_data import import_comics
+from utils import get_comics_page, get_storyline_index, set_comics_status
+
+CSV_HEADER = ['Issue', 'Issue Number', 'Series Start Year', 'Issue Published Year', 'TBP', 'Availability',
+              'Storyline', 'Story Order', 'Status']
+
+
+def write_csv(path, rows, series_prefix):
+    """Write a CSV of `rows` comics in series of 500 issues."""
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        for i in range(rows):
+            writer.writerow([f'{series_prefix} {i // 500}', str(i % 500 + 1), 1960 + (i // 500) % 50, 1970,
+                             'TPB', 'Library', f'Story {i // 40}', i % 40 + 1, 'Read' if i % 3 == 0 else ''])
+
+
+def create_app(path, baseline):
+    """Create a minimal app bound to the benchmark database."""
+    app = Flask(__name__)
+    uri = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    if baseline:
+        database.SQLITE_PRAGMAS.clear()
+    else:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri)
+    db.init_app(app)
+    return app
+
+
+def run_loop(app, action, stop, latencies, errors):
+    """Call `action` repeatedly until `stop` is set, timing every call."""
+    with app.app_context():
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                action()
+            except OperationalError:
+                db.session.rollback()
+                errors.append(time.perf_counter() - started)
+            else:
+                latencies.append(time.perf_counter() - started)
+            db.session.remove()
+
+
+def report(name, latencies, errors):
+    """Print latency percentiles for one kind of operation."""
+    if not latencies:
+        print(f"{name:>8}: no successful calls, {len(errors)} errors")
+        return
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    print(f"{name:>8}: {len(latencies):6d} ok  {len(errors):4d} locked  "
+          f"p50 {statistics.median(latencies) * 1000:8.1f} ms  p95 {p95 * 1000:8.1f} ms  "
+          f"max {latencies[-1] * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed-rows', type=int, default=20000, help='Comics in the database before the import.')
+    parser.add_argument('--rows', type=int, default=100000, help='Comics written by the concurrent import.')
+    parser.add_argument('--readers', type=int, default=4, help='Number of reader threads.')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Commit the import in chunks, as background import jobs do.')
+    parser.add_argument('--baseline', action='store_true', help="Use SQLite's default connection settings.")
+    args = parser.parse_args()
+
+    # Benchmark the database only: fail every Comic Vine lookup without a request
+    api_client.rate_limiter.block()
+
+    workdir = tempfile.mkdtemp(prefix='comics-bench-')
+    try:
+        app = create_app(os.path.join(workdir, 'comics.db'), args.baseline)
+        seed_csv = os.path.join(workdir, 'seed.csv')
+        import_csv = os.path.join(workdir, 'import.csv')
+        write_csv(seed_csv, args.seed_rows, 'Seed')
+        write_csv(import_csv, args.rows, 'Series')
+
+        with app.app_context():
+            db.create_all()
+            import_comics(seed_csv)
+
+        stop = threading.Event()
+        reads, read_errors, toggles, toggle_errors = [], [], [], []
+
+        def read():
+            get_storyline_index()
+            get_comics_page('id')
+
+        def toggle():
+            set_comics_status('Read', ids=[random.randint(1, args.seed_rows)])
+            db.session.commit()
+            time.sleep(0.05)
+
+        threads = [threading.Thread(target=run_loop, args=(app, read, stop, reads, read_errors))
+                   for _ in range(args.readers)]
+        threads.append(threading.Thread(target=run_loop, args=(app, toggle, stop, toggles, toggle_errors)))
+
+        with app.app_context():
+            for thread in threads:
+                thread.start()
+            started = time.perf_counter()
+            summary = import_comics(import_csv, streaming=args.streaming)
+            elapsed = time.perf_counter() - started
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        mode = 'baseline' if args.baseline else 'tuned'
+        print(f"{mode}: imported {summary['added']} comics in {elapsed:.1f}s "
+              f"with {args.readers} readers and 1 toggler running")
+        report('reads', reads, read_errors)
+        report('toggles', toggles, toggle_errors)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
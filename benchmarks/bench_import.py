@@ -0,0 +1,177 @@
+"""
+    Import throughput benchmark against the fake Comic Vine server.
+
+    For every size, a synthetic CSV is imported into a fresh database with a cold
+    API response cache, and the run reports:
+        - rows/sec: CSV rows imported per second of wall time.
+        - calls/row: Comic Vine requests per CSV row (retries included).
+        - DB time: Seconds spent executing SQL statements.
+        - peak memory: Largest Python heap size during the import (tracemalloc,
+          which also slows the run down a little).
+
+    Usage:
+
+        python benchmarks/bench_import.py                        # 1k, 10k and 100k rows
+        python benchmarks/bench_import.py --sizes 1000 --latency 0.05 --streaming
+        python benchmarks/bench_import.py --json results.json    # keep results for comparison
+
+    No real API quota is spent: COMIC_VINE_BASE_URL points at an in-process
+    `FakeComicVine`, and the client-side rate limits are lifted unless set in the
+    environment.
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_comicvine import FakeComicVine
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+CSV_HEADER = ['Issue', 'Issue Number', 'Series Start Year', 'Issue Published Year', 'TBP', 'Availability',
+              'Storyline', 'Story Order', 'Status']
+
+
+def write_csv(path, rows, issues_per_series):
+    """Write a CSV of `rows` comics spread over series of `issues_per_series` issues."""
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        for i in range(rows):
+            series = i // issues_per_series
+            writer.writerow([f'Series {series}', str(i % issues_per_series + 1), 1960 + series % 50, 1970,
+                             'TPB', 'Library', f'Story {i // 40}', i % 40 + 1, 'Read' if i % 3 == 0 else ''])
+
+
+class QueryTimer:
+    """Sum the time spent executing SQL statements on an engine."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.seconds = 0.0
+        self.statements = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._before)
+        event.listen(engine, 'after_cursor_execute', self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - self._local.started
+        with self._lock:
+            self.seconds += elapsed
+            self.statements += 1
+
+    def reset(self):
+        with self._lock:
+            self.seconds = 0.0
+            self.statements = 0
+
+
+def run(size, args, workdir):
+    """Import one synthetic CSV into a fresh database and measure it."""
+    from flask import Flask
+
+    import api_client
+    from database import db, engine_options
+    from import_data import import_comics
+
+    csv_path = os.path.join(workdir, f'comics_{size}.csv')
+    write_csv(csv_path, size, args.issues_per_series)
+
+    app = Flask(__name__)
+    uri = f"sqlite:///{os.path.join(workdir, f'comics_{size}.db')}"
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        timer = QueryTimer(db.engine)
+        timer.reset()
+        api_client.api_cache.clear()
+        api_client.volume_index.clear()
+        stats_before = api_client.http_client.stats.snapshot()
+
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+        tracemalloc.start()
+        started = time.perf_counter()
+        with output:
+            summary = import_comics(csv_path, max_workers=args.workers, streaming=args.streaming)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        stats_after = api_client.http_client.stats.snapshot()
+        calls = stats_after['calls'] - stats_before['calls']
+        db.session.remove()
+        db.engine.dispose()
+
+    return {
+        'rows': size,
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(size / elapsed, 1),
+        'api_calls': calls,
+        'calls_per_row': round(calls / size, 4),
+        'api_errors': stats_after['errors'] - stats_before['errors'],
+        'db_seconds': round(timer.seconds, 3),
+        'db_statements': timer.statements,
+        'peak_mb': round(peak / (1024 * 1024), 1),
+        'added': summary['added'],
+        'enriched': summary['enriched'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='CSV sizes to import.')
+    parser.add_argument('--issues-per-series', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=4, help='Enrichment worker threads.')
+    parser.add_argument('--streaming', action='store_true', help='Commit in chunks, as import jobs do.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Fake API latency per request, in seconds.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of fake 5xx responses.')
+    parser.add_argument('--json', metavar='PATH', help='Also write the results to a JSON file.')
+    parser.add_argument('--verbose', action='store_true', help="Show the importer's output.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='comics-bench-')
+    fake = FakeComicVine(latency=args.latency, error_rate=args.error_rate,
+                         issues_per_volume=args.issues_per_series, seed=0)
+    # Configure the API client before it is imported
+    os.environ['COMIC_VINE_BASE_URL'] = fake.start()
+    os.environ['COMIC_VINE_CACHE_PATH'] = os.path.join(workdir, 'comicvine_cache.db')
+    os.environ.setdefault('COMIC_VINE_HOURLY_LIMIT', '1000000000')
+    os.environ.setdefault('COMIC_VINE_MAX_RPS', '1000000')
+    os.environ.setdefault('COMIC_VINE_API_KEY', 'benchmark')
+
+    results = []
+    try:
+        print(f"{'rows':>8} {'seconds':>8} {'rows/sec':>10} {'calls/row':>10} {'DB time':>8} {'peak MB':>8}")
+        for size in args.sizes:
+            result = run(size, args, workdir)
+            results.append(result)
+            print(f"{result['rows']:>8} {result['seconds']:>8.2f} {result['rows_per_sec']:>10.0f} "
+                  f"{result['calls_per_row']:>10.4f} {result['db_seconds']:>7.2f}s {result['peak_mb']:>8.1f}")
+    finally:
+        fake.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'args': vars(args), 'results': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+    Measure full-text search latency on a large collection.
+
+    A database is seeded with comics whose series, titles and storylines are drawn
+    from a small vocabulary, the FTS5 index is built, and a set of queries (short
+    prefixes, whole words and multi-word searches) is run repeatedly through
+    `search_comics`. The same queries are then run through the LIKE fallback for
+    comparison.
+
+        python benchmarks/bench_search.py --rows 100000
+
+    Comic Vine is never contacted.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+
+import search
+from database import db, engine_options
+from models import Comic
+from search import create_search_index, search_comics
+
+WORDS = ['amazing', 'spider', 'man', 'batman', 'detective', 'comics', 'superman', 'action', 'wonder', 'woman',
+         'flash', 'green', 'lantern', 'arrow', 'justice', 'league', 'avengers', 'uncanny', 'x-men', 'fantastic',
+         'four', 'incredible', 'hulk', 'iron', 'thor', 'captain', 'america', 'daredevil', 'punisher', 'saga',
+         'crisis', 'infinite', 'earths', 'secret', 'wars', 'civil', 'war', 'dark', 'knight', 'returns']
+AVAILABILITY = ['Library', 'Hoopla', 'Kindle', 'Comixology', 'Owned']
+QUERIES = ['sp', 'bat', 'spider man', 'crisis infinite', 'wonder woman lib', 'dark kn ret', 'hoopla', 'zzz']
+
+
+def seed(rows, rng):
+    """Insert `rows` comics in batches with a Core INSERT."""
+    batch = []
+    for i in range(rows):
+        series = ' '.join(rng.sample(WORDS, 2)).title()
+        batch.append({
+            'issue': series,
+            'issue_number': str(i + 1),
+            'issue_title': ' '.join(rng.sample(WORDS, 3)).title(),
+            'series_start_year': 1960 + i % 60,
+            'tbp': f'{series} Vol. {i % 7 + 1}',
+            'availability': rng.choice(AVAILABILITY),
+            'storyline': ' '.join(rng.sample(WORDS, 2)).title(),
+            'story_order': i % 40 + 1,
+            'status': 'Read' if i % 3 == 0 else 'Unread',
+        })
+        if len(batch) == 10000:
+            db.session.execute(insert(Comic), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(Comic), batch)
+    db.session.commit()
+
+
+def measure(repeat):
+    """Run every query `repeat` times and print latency percentiles."""
+    for query in QUERIES:
+        latencies = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = search_comics(query, limit=50)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+        print(f"  {query!r:>20}: {len(results):3d} results  p50 {statistics.median(latencies) * 1000:8.2f} ms  "
+              f"p95 {p95 * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help='Comics in the database.')
+    parser.add_argument('--repeat', type=int, default=50, help='Runs of each query.')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the generated collection.')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='comics-bench-')
+    try:
+        app = Flask(__name__)
+        uri = f"sqlite:///{os.path.join(workdir, 'comics.db')}"
+        app.config['SQLALCHEMY_DATABASE_URI'] = uri
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri)
+        db.init_app(app)
+
+        with app.app_context():
+            db.create_all()
+            started = time.perf_counter()
+            seed(args.rows, random.Random(args.seed))
+            print(f"seeded {args.rows} comics in {time.perf_counter() - started:.1f}s")
+
+            started = time.perf_counter()
+            if not create_search_index():
+                sys.exit("FTS5 is not available in this SQLite build.")
+            print(f"built the search index in {time.perf_counter() - started:.1f}s")
+
+            print("fts5:")
+            measure(args.repeat)
+            search._fts_available = False
+            print("like fallback:")
+            measure(max(1, args.repeat // 10))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+"""
+    Local stand-in for the Comic Vine API, for benchmarks and offline testing.
+
+    Serves the three endpoints the importer uses, with deterministic synthetic data:
+        - /api/search/?query=<name>&resources=volume: one volume per start year
+          from 1930 to 2029 for any query, so every (series, start year) pair
+          resolves. Results are paginated with offset/limit (at most 100 per page).
+        - /api/issues/?filter=volume:<id>: `issues_per_volume` issues numbered
+          1..N, paginated the same way.
+        - /api/issue/4000-<id>/: the details of one issue.
+
+    `field_list` is honored, responses are gzip-compressed when the client accepts
+    it, and faults can be injected: a fixed latency (plus jitter) per request, a
+    fraction of 5xx responses, and HTTP 420 once a number of requests was served.
+
+    Point the app at it with the COMIC_VINE_BASE_URL environment variable:
+
+        python benchmarks/fake_comicvine.py --port 8765 --latency 0.1
+        COMIC_VINE_BASE_URL=http://127.0.0.1:8765/api python app.py
+
+    Or start it in-process:
+
+        with FakeComicVine(latency=0.05) as fake:
+            os.environ['COMIC_VINE_BASE_URL'] = fake.base_url
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIRST_YEAR = 1930
+LAST_YEAR = 2029
+MAX_PAGE_SIZE = 100
+DETAIL_PREFIX = '4000-'
+
+
+class FakeComicVine:
+    """
+    Threaded fake Comic Vine server.
+
+    Attributes:
+        latency (float): Seconds added to every response.
+        jitter (float): Up to this many extra seconds added at random.
+        error_rate (float): Fraction of requests answered with HTTP 502/503.
+        rate_limit_after (int): Answer HTTP 420 once this many requests were
+            served; None never rate-limits.
+        issues_per_volume (int): Number of issues in every volume.
+        calls (dict): Requests served per endpoint ('search', 'issues', 'issue').
+        requests (list): (endpoint, query parameters) of every request, in order.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit_after=None, issues_per_volume=100, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_after = rate_limit_after
+        self.issues_per_volume = issues_per_volume
+        self.calls = {}
+        self.requests = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._served = 0
+        self._thread = None
+
+        fake = self
+
+        class Handler(_Handler):
+            server_fake = fake
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        """str: The API root to use as COMIC_VINE_BASE_URL."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/api'
+
+    def start(self):
+        """Serve requests on a background thread and return the base URL."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def next_fault(self, endpoint, query=None):
+        """
+        Count a request and decide whether it fails.
+
+        Args:
+            endpoint (str): 'search', 'issues' or 'issue'.
+            query (dict, optional): The request's query parameters, recorded in
+                `requests`.
+
+        Returns:
+            int: The HTTP status to answer with instead of data, or None.
+        """
+        with self._lock:
+            self._served += 1
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            self.requests.append((endpoint, query or {}))
+            if self.rate_limit_after is not None and self._served > self.rate_limit_after:
+                return 420
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self._random.choice((502, 503))
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        return None
+
+
+def volume_id(name, start_year):
+    """Deterministic volume id for a series name and start year."""
+    return (zlib.crc32(name.strip().lower().encode()) % 1000000) * 1000 + (int(start_year) - FIRST_YEAR)
+
+
+def _page(items, query):
+    """Slice a result list by the offset and limit parameters."""
+    offset = int(query.get('offset', 0))
+    limit = min(int(query.get('limit', MAX_PAGE_SIZE)), MAX_PAGE_SIZE)
+    return items[offset:offset + limit], offset, limit
+
+
+def _select_fields(result, field_list):
+    """Keep only the requested fields, as Comic Vine does for `field_list`."""
+    if not field_list:
+        return result
+    fields = field_list.split(',')
+    return {key: value for key, value in result.items() if key in fields}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_fake = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        parts = [part for part in url.path.split('/') if part]
+        if len(parts) < 2 or parts[0] != 'api':
+            return self._send(404, {'status_code': 101, 'error': 'Object Not Found', 'results': []})
+
+        endpoint = 'issue' if parts[1] == 'issue' else parts[1]
+        fault = self.server_fake.next_fault(endpoint, query)
+        if fault == 420:
+            return self._send(420, {'status_code': 107, 'error': 'Rate limit exceeded', 'results': []})
+        if fault:
+            return self._send(fault, {'error': 'Injected server error'})
+
+        if endpoint == 'search':
+            body = self._search(query)
+        elif endpoint == 'issues':
+            body = self._issues(query)
+        elif endpoint == 'issue' and len(parts) > 2 and parts[2].startswith(DETAIL_PREFIX):
+            body = self._issue(int(parts[2][len(DETAIL_PREFIX):]), query)
+        else:
+            return self._send(404, {'status_code': 101, 'error': 'Object Not Found', 'results': []})
+        self._send(200, body)
+
+    def _search(self, query):
+        name = query.get('query', '').strip()
+        volumes = [{'id': volume_id(name, year), 'name': name, 'start_year': str(year),
+                    'resource_type': 'volume'}
+                   for year in range(FIRST_YEAR, LAST_YEAR + 1)]
+        return self._listing(volumes, query)
+
+    def _issues(self, query):
+        volume = int(query.get('filter', 'volume:0').split(':', 1)[1])
+        issues = [self._issue_document(volume * 10000 + number, number)
+                  for number in range(1, self.server_fake.issues_per_volume + 1)]
+        return self._listing(issues, query)
+
+    def _issue(self, issue_id, query):
+        document = self._issue_document(issue_id, issue_id % 10000)
+        return {'status_code': 1, 'error': 'OK', 'number_of_total_results': 1,
+                'results': _select_fields(document, query.get('field_list'))}
+
+    def _issue_document(self, issue_id, number):
+        host = self.headers.get('Host', 'localhost')
+        return {
+            'id': issue_id,
+            'issue_number': str(number),
+            'name': f'Issue {number}',
+            'image': {'original_url': f'http://{host}/covers/{issue_id}.jpg'},
+            # Full documents are large; field_list keeps this out of the response
+            'description': '<p>' + 'Synthetic description. ' * 40 + '</p>',
+        }
+
+    def _listing(self, items, query):
+        page, offset, limit = _page(items, query)
+        return {
+            'status_code': 1,
+            'error': 'OK',
+            'limit': limit,
+            'offset': offset,
+            'number_of_page_results': len(page),
+            'number_of_total_results': len(items),
+            'results': [_select_fields(item, query.get('field_list')) for item in page],
+        }
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        gzipped = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            payload = gzip.compress(payload, compresslevel=5)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a fake Comic Vine API server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra latency, in seconds.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of 5xx responses.')
+    parser.add_argument('--rate-limit-after', type=int, default=None,
+                        help='Answer HTTP 420 after this many requests.')
+    parser.add_argument('--issues-per-volume', type=int, default=100)
+    args = parser.parse_args()
+
+    fake = FakeComicVine(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                         error_rate=args.error_rate, rate_limit_after=args.rate_limit_after,
+                         issues_per_volume=args.issues_per_volume)
+    print(f"Serving a fake Comic Vine API at {fake.base_url} (Ctrl+C to stop)")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        fake._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+    Command-line importer for large reading lists.
+
+    Imports CSV files straight into the database, without the web app's upload
+    form or its 2 MB request limit, and without loading the web app itself
+    (routes, WTForms, CSRF and templates). Run it from the project directory:
+
+        python cli.py import reading-list.csv more-lists/ --no-enrich
+        python cli.py enrich
+
+    `import` accepts files and directories (every *.csv inside, in name order).
+    Files are read and parsed by a pool of worker processes while the main
+    process writes the previous file, so several files import back to back; at
+    most one more file than there are workers is parsed ahead of the import.
+    `--no-enrich` skips Comic Vine entirely; `enrich` fetches the missing issue
+    titles and covers afterwards, and can be re-run after hitting the rate limit.
+
+    A throughput summary (rows/sec, API calls) is printed at the end.
+
+    Every import and enrichment run bumps the data version stored in the database,
+    so a running web app drops its cached views on its next request.
+
+    Environment variables:
+        - DATABASE_URI: The database to import into (same default as the app).
+        - COMIC_VINE_API_KEY and the other Comic Vine settings used by the app.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger('cli')
+
+
+def find_csv_files(paths):
+    """
+    Expand files and directories into the list of CSV files to import.
+
+    Args:
+        paths (list): File and directory paths.
+
+    Returns:
+        list: CSV file paths, directories expanded in name order.
+
+    Raises:
+        FileNotFoundError: If a path does not exist.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith('.csv') and os.path.isfile(os.path.join(path, name))
+            )
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+    return files
+
+
+def create_app(database_uri=None):
+    """
+    Create a bare Flask application that only hosts the database extension.
+
+    Flask-SQLAlchemy needs an application context for its session; nothing else
+    of the web app is loaded. Relative SQLite paths resolve against the same
+    instance folder as the app's.
+
+    Args:
+        database_uri (str, optional): Overrides DATABASE_URI.
+
+    Returns:
+        Flask: The application.
+    """
+    from flask import Flask
+    from database import db, engine_options
+
+    app = Flask('comic_tracker', root_path=PROJECT_DIR)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri or os.getenv('DATABASE_URI', 'sqlite:///comics.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    db.init_app(app)
+    return app
+
+
+def _read_csv(filepath):
+    """Worker process entry point: parse one CSV file."""
+    from import_data import read_csv
+
+    started = time.perf_counter()
+    rows = read_csv(filepath)
+    return rows, time.perf_counter() - started
+
+
+def run_import(args):
+    """Import every CSV file named on the command line."""
+    from database import db
+    from import_data import import_comics
+
+    files = find_csv_files(args.paths)
+    if not files:
+        logger.error("No CSV files found.")
+        return 1
+    if args.prune and len(files) > 1:
+        # Pruning after each file would delete the comics of the files before it
+        logger.error("--prune needs exactly one CSV file.")
+        return 1
+
+    totals = {'rows': 0, 'enriched': 0, 'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    parse_seconds = 0.0
+    started = time.perf_counter()
+    # Start parsing before any database connection is opened, so the worker
+    # processes never inherit one. Streaming imports read their file chunk by
+    # chunk themselves.
+    pool = None if args.streaming else ProcessPoolExecutor(max_workers=min(args.jobs, len(files)))
+    # Parsed files wait in memory until the main process imports them, so only
+    # keep one more parse in flight than there are workers
+    in_flight = min(args.jobs, len(files)) + 1
+    try:
+        parsed = {index: pool.submit(_read_csv, path) for index, path in enumerate(files[:in_flight])} if pool else {}
+        with create_app(args.database).app_context():
+            _prepare_database(db)
+            for index, path in enumerate(files):
+                rows = None
+                # Popping also drops the future's copy of the rows once they are imported
+                future = parsed.pop(index, None)
+                if future is not None:
+                    following = index + in_flight
+                    if following < len(files):
+                        parsed[following] = pool.submit(_read_csv, files[following])
+                    rows, seconds = future.result()
+                    parse_seconds += seconds
+                file_started = time.perf_counter()
+                summary = import_comics(path, max_workers=args.workers, chunk_size=args.chunk_size,
+                                        streaming=args.streaming, prune=args.prune, enrich=not args.no_enrich,
+                                        rows=rows)
+                elapsed = time.perf_counter() - file_started
+                for count in totals:
+                    totals[count] += summary[count] or 0
+                print(f"{path}: {summary['rows']} rows in {elapsed:.1f}s "
+                      f"({_rate(summary['rows'], elapsed)} rows/s), {summary['added']} added, "
+                      f"{summary['updated']} updated, {summary['unchanged']} unchanged")
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"Imported {totals['rows']} rows from {len(files)} file(s) in {elapsed:.1f}s "
+          f"({_rate(totals['rows'], elapsed)} rows/s)")
+    print(f"  {totals['added']} added, {totals['updated']} updated, {totals['unchanged']} unchanged"
+          + (f", {totals['removed']} removed" if args.prune else ''))
+    if not args.streaming:
+        print(f"  parsing: {parse_seconds:.1f}s of worker time across {min(args.jobs, len(files))} process(es)")
+    _print_api_summary(totals['enriched'])
+    return 0
+
+
+def run_enrich(args):
+    """Fetch missing Comic Vine details for comics already in the database."""
+    from database import db
+    from import_data import enrich_comics
+
+    started = time.perf_counter()
+    with create_app(args.database).app_context():
+        _prepare_database(db)
+        summary = enrich_comics(max_workers=args.workers, chunk_size=args.chunk_size, limit=args.limit)
+
+    elapsed = time.perf_counter() - started
+    print(f"Checked {summary['checked']} comics missing details in {elapsed:.1f}s "
+          f"({_rate(summary['checked'], elapsed)} comics/s)")
+    _print_api_summary(summary['enriched'])
+    return 0
+
+
+def _prepare_database(db):
+    """Create missing tables and apply schema upgrades, as the app does on startup."""
+    from migrations import upgrade_database
+
+    db.create_all()
+    upgrade_database()
+
+
+def _print_api_summary(enriched):
+    """Print the Comic Vine calls made by this run."""
+    from api_client import http_client
+
+    stats = http_client.stats.snapshot()
+    print(f"  {enriched} comics enriched, {stats['calls']} Comic Vine calls "
+          f"({stats['errors']} errors, {stats['latency']:.1f}s waiting)")
+
+
+def _rate(count, seconds):
+    return f"{count / seconds:.0f}" if seconds > 0 else '-'
+
+
+def build_parser():
+    """Build the argument parser for the `import` and `enrich` commands."""
+    # Read here rather than from enrichment.DEFAULT_WORKERS so `--help` loads nothing
+    workers_default = int(os.getenv('COMIC_VINE_WORKERS', 4))
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', help='Database URI (default: $DATABASE_URI or sqlite:///comics.db).')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log import progress and details.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help='Import CSV files or directories of CSV files.')
+    import_parser.add_argument('paths', nargs='+', help='CSV files, or directories containing CSV files.')
+    import_parser.add_argument('--no-enrich', action='store_true',
+                               help='Do not call Comic Vine; run `enrich` later to fill in titles and covers.')
+    import_parser.add_argument('--prune', action='store_true',
+                               help='Delete comics that are not in the file (single file only).')
+    import_parser.add_argument('--streaming', action='store_true',
+                               help='Commit every chunk and resume interrupted imports (parses in-process).')
+    import_parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                               help='Worker processes used to parse files (default: CPU count).')
+    import_parser.add_argument('--workers', type=int, default=workers_default,
+                               help='Threads used for Comic Vine lookups.')
+    import_parser.add_argument('--chunk-size', type=int, default=500, help='Rows per bulk statement.')
+    import_parser.set_defaults(handler=run_import)
+
+    enrich_parser = commands.add_parser('enrich', help='Fetch missing issue titles and covers from Comic Vine.')
+    enrich_parser.add_argument('--limit', type=int, help='Stop after this many comics.')
+    enrich_parser.add_argument('--workers', type=int, default=workers_default,
+                               help='Threads used for Comic Vine lookups.')
+    enrich_parser.add_argument('--chunk-size', type=int, default=500, help='Rows per bulk statement.')
+    enrich_parser.set_defaults(handler=run_enrich)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(levelname)s %(name)s: %(message)s')
+    # SQLAlchemy logs every statement at INFO
+    logging.getLogger('sqlalchemy').setLevel(logging.WARNING)
+
+    try:
+        return args.handler(args)
+    except FileNotFoundError as e:
+        logger.error(e)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+    Local cover-image cache.
+
+    Covers are downloaded once from `cover_image_url` and stored content-addressed
+    (by SHA-256 of the image bytes) under the covers directory, so a cover shared
+    by several comics is stored once. A small JPEG thumbnail sized for the comics
+    grid is generated next to it. The `/covers/<id>` route serves these files with
+    long-lived cache headers instead of hotlinking Comic Vine's full-size scans.
+
+    Layout:
+        <COVERS_DIR>/originals/ab/abcdef....jpg
+        <COVERS_DIR>/thumbs/ab/abcdef....jpg
+
+    Missing covers are fetched in batches, each committed on its own, so an
+    interrupted backfill keeps the covers it already stored. A URL that cannot be
+    downloaded or decoded is skipped until `cover_retry_at` instead of being tried
+    again on every run.
+
+    Environment variables:
+        - COVERS_DIR: Where covers are stored (default: instance/covers).
+        - COVER_DOWNLOAD_WORKERS: Parallel downloads (default 4).
+"""
+
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+from PIL import Image
+from sqlalchemy import or_, select, update
+
+from database import db
+from http_client import HttpClient
+from models import Comic
+from view_cache import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+COVERS_DIR = os.getenv(
+    'COVERS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'covers'),
+)
+DOWNLOAD_WORKERS = int(os.getenv('COVER_DOWNLOAD_WORKERS', 4))
+
+# Bounding box of the grid thumbnails; cards are at most ~400px wide and 600px tall
+THUMBNAIL_SIZE = (400, 600)
+THUMBNAIL_QUALITY = 85
+
+# Distinct cover URLs downloaded and committed together
+BATCH_SIZE = 100
+# How long a URL that failed to download is left alone
+RETRY_DELAY = timedelta(days=1)
+
+_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+
+# Separate from the Comic Vine API client: different host, and downloads should
+# not count against the API statistics.
+cover_client = HttpClient(read_timeout=60.0, max_retries=2, pool_size=DOWNLOAD_WORKERS)
+
+
+def cache_cover(url):
+    """
+    Download a cover and store it with a thumbnail, unless already stored.
+
+    Args:
+        url (str): The cover image URL.
+
+    Returns:
+        dict: 'cover_path', 'cover_thumb_path' (relative to `COVERS_DIR`),
+            'cover_width' and 'cover_height' of the thumbnail; or None if the
+            download failed or the data is not an image.
+    """
+    try:
+        response = cover_client.get(url)
+    except requests.RequestException as e:
+        logger.warning(f"Could not download cover {url}: {e}")
+        return None
+    if response.status_code != 200:
+        logger.warning(f"Could not download cover {url}: HTTP {response.status_code}")
+        return None
+
+    data = response.content
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        image = Image.open(io.BytesIO(data))
+        extension = _EXTENSIONS.get(image.format, 'img')
+        # Image.open only reads the header; decode now so truncated or corrupt
+        # downloads are rejected here rather than when the thumbnail is made.
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.warning(f"Cover {url} is not a usable image: {e}")
+        return None
+
+    cover_path = os.path.join('originals', digest[:2], f'{digest}.{extension}')
+    thumb_path = os.path.join('thumbs', digest[:2], f'{digest}.jpg')
+
+    _write_once(cover_path, data)
+    thumb_file = os.path.join(COVERS_DIR, thumb_path)
+    if os.path.exists(thumb_file):
+        with Image.open(thumb_file) as thumbnail:
+            width, height = thumbnail.size
+    else:
+        thumbnail = image.convert('RGB')
+        thumbnail.thumbnail(THUMBNAIL_SIZE)
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+        _write_once(thumb_path, buffer.getvalue())
+        width, height = thumbnail.size
+
+    return {
+        'cover_path': cover_path,
+        'cover_thumb_path': thumb_path,
+        'cover_width': width,
+        'cover_height': height,
+    }
+
+
+def _write_once(relative_path, data):
+    """Atomically write a content-addressed file if it does not exist yet."""
+    path = os.path.join(COVERS_DIR, relative_path)
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+
+def _cache_cover_logged(url):
+    """Cache one cover, logging any unexpected error instead of raising it."""
+    try:
+        return cache_cover(url)
+    except Exception:
+        logger.exception(f"Could not cache cover {url}")
+        return None
+
+
+def cache_missing_covers(limit=None, batch_size=BATCH_SIZE):
+    """
+    Download and thumbnail every cover that is not cached locally yet.
+
+    Must be called inside an application context. Each batch of URLs is committed
+    as soon as it is done; URLs that fail are marked to be retried after
+    `RETRY_DELAY`.
+
+    Args:
+        limit (int, optional): Maximum number of distinct cover URLs to fetch.
+        batch_size (int): Distinct cover URLs downloaded per committed batch.
+
+    Returns:
+        int: Number of comics whose cover was cached.
+    """
+    now = datetime.utcnow()
+    query = (
+        select(Comic.cover_image_url)
+        .where(Comic.cover_image_url.isnot(None), Comic.cover_image_url != '', Comic.cover_path.is_(None),
+               or_(Comic.cover_retry_at.is_(None), Comic.cover_retry_at <= now))
+        .distinct()
+    )
+    if limit:
+        query = query.limit(limit)
+    urls = db.session.execute(query).scalars().all()
+    if not urls:
+        return 0
+
+    updated = failed = 0
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix='covers') as executor:
+        for start in range(0, len(urls), batch_size):
+            batch = urls[start:start + batch_size]
+            batch_updated = 0
+            for url, cover in zip(batch, executor.map(_cache_cover_logged, batch)):
+                if cover:
+                    values = dict(cover, cover_retry_at=None)
+                else:
+                    values = {'cover_retry_at': datetime.utcnow() + RETRY_DELAY}
+                    failed += 1
+                result = db.session.execute(update(Comic).where(Comic.cover_image_url == url).values(**values))
+                if cover:
+                    batch_updated += result.rowcount
+            if batch_updated:
+                bump_data_version()
+            db.session.commit()
+            updated += batch_updated
+    logger.info(f"Cached covers for {updated} comics ({len(urls)} images, {failed} failed).")
+    return updated
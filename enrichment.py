@@ -0,0 +1,97 @@
+"""
+    Concurrent Comic Vine enrichment stage for CSV imports.
+
+    `import_comics` parses and validates the whole file first, then hands the
+    lookups that need API data to `enrich_lookups`, which resolves them on a thread
+    pool before any database writes happen.
+
+    Lookups are grouped by (series, start year) and each group is resolved by a
+    single task, so a volume is searched and its issue list fetched only once even
+    when many rows share it. All workers share the rate limiter in `api_client`.
+    When the API answers HTTP 420 (or the hourly quota runs out) the remaining
+    tasks are cancelled and the lookups resolved so far are returned.
+
+    Environment variables:
+        - COMIC_VINE_WORKERS: Default number of worker threads.
+"""
+
+import logging
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from api_client import ComicVineResolver
+from rate_limit import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.getenv('COMIC_VINE_WORKERS', 4))
+
+
+def enrich_lookups(lookups, resolver=None, max_workers=DEFAULT_WORKERS):
+    """
+    Resolve issue details for a set of lookups concurrently.
+
+    Args:
+        lookups (iterable): (series_name, start_year, issue_number) tuples. Duplicates
+            are resolved once.
+        resolver (ComicVineResolver, optional): Resolver shared across the import.
+        max_workers (int): Number of worker threads.
+
+    Returns:
+        dict: Maps each resolved lookup tuple to its issue details. Lookups that were
+            not found, failed, or were cancelled are absent.
+    """
+    resolver = resolver or ComicVineResolver()
+
+    groups = defaultdict(set)
+    for series_name, start_year, issue_number in lookups:
+        groups[(series_name, start_year)].add(issue_number)
+    if not groups:
+        return {}
+
+    results = {}
+    stop = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [
+            executor.submit(_enrich_group, resolver, series_name, start_year, issue_numbers, results, stop)
+            for (series_name, start_year), issue_numbers in groups.items()
+        ]
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            try:
+                future.result()
+            except RateLimitExceeded as e:
+                if not stop.is_set():
+                    logger.warning(f"Stopping enrichment: {e}")
+                    stop.set()
+                    for pending in futures:
+                        pending.cancel()
+            except Exception as e:
+                logger.error(f"Error during enrichment: {e}")
+
+    logger.info(f"Enriched {len(results)} of {sum(len(n) for n in groups.values())} lookups.")
+    return results
+
+
+def _enrich_group(resolver, series_name, start_year, issue_numbers, results, stop):
+    """
+    Resolve every issue of one series, stopping early once `stop` is set.
+
+    Args:
+        resolver (ComicVineResolver): Resolver shared across the import.
+        series_name (str): The name of the comic series.
+        start_year (int): The year the series started.
+        issue_numbers (set): Issue numbers to resolve.
+        results (dict): Shared output dict, keyed by lookup tuple.
+        stop (threading.Event): Set when pending work should be abandoned.
+    """
+    for issue_number in sorted(issue_numbers):
+        if stop.is_set():
+            return
+        details = resolver.get_issue_details(series_name, start_year, issue_number)
+        if details:
+            results[(series_name, start_year, issue_number)] = details
@@ -0,0 +1,184 @@
+"""
+    Pooled HTTP client used for Comic Vine requests.
+
+    A single `requests.Session` with a mounted `HTTPAdapter` keeps connections alive
+    between calls, so consecutive requests to Comic Vine reuse the same TCP/TLS
+    connection instead of handshaking every time. The underlying urllib3 pool is
+    thread-safe and sized for the enrichment worker pool.
+
+    Transient failures (5xx responses, timeouts and connection errors) are retried
+    with jittered exponential backoff. Responses are requested gzip-encoded and
+    decoded transparently. Every attempt records its latency, status and size.
+
+    Environment variables:
+        - COMIC_VINE_CONNECT_TIMEOUT: Connect timeout in seconds.
+        - COMIC_VINE_READ_TIMEOUT: Read timeout in seconds.
+        - COMIC_VINE_MAX_RETRIES: Retries after the first attempt.
+        - COMIC_VINE_POOL_SIZE: Maximum pooled connections per host.
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = 'ComicTracker/1.0'
+
+
+class CallStats:
+    """
+    Thread-safe running totals for HTTP calls.
+
+    Attributes:
+        calls (int): Number of attempts made, including retries.
+        errors (int): Attempts that failed with an exception or a 5xx status.
+        bytes (int): Bytes received over the wire (compressed size).
+        latency (float): Total time spent waiting on responses, in seconds.
+        statuses (dict): Count of attempts per HTTP status code.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zero every counter."""
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.latency = 0.0
+        self.statuses = {}
+
+    def record(self, status, latency, size):
+        """
+        Add one attempt to the totals.
+
+        Args:
+            status (int): HTTP status code, or None if no response was received.
+            latency (float): Seconds spent on the attempt.
+            size (int): Bytes received.
+        """
+        with self._lock:
+            self.calls += 1
+            self.latency += latency
+            self.bytes += size
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if status is None or status >= 500:
+                self.errors += 1
+
+    def snapshot(self):
+        """
+        Return a copy of the current totals.
+
+        Returns:
+            dict: calls, errors, bytes, latency and statuses.
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'errors': self.errors,
+                'bytes': self.bytes,
+                'latency': self.latency,
+                'statuses': dict(self.statuses),
+            }
+
+
+class HttpClient:
+    """
+    Keep-alive HTTP client with retries and per-call accounting.
+
+    Attributes:
+        timeout (tuple): (connect, read) timeouts in seconds.
+        max_retries (int): Retries after the first attempt for transient failures.
+        backoff_base (float): Base delay in seconds for exponential backoff.
+        backoff_max (float): Upper bound for a single backoff delay.
+        stats (CallStats): Running totals for every attempt.
+        listeners (list): Callables invoked as listener(url, status, latency, size)
+            after every attempt.
+    """
+
+    def __init__(self, connect_timeout=5.0, read_timeout=30.0, max_retries=3,
+                 backoff_base=0.5, backoff_max=30.0, pool_size=10):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = CallStats()
+        self.listeners = []
+
+        self.session = requests.Session()
+        # Retries are handled here so that every attempt is timed and recorded.
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff delay for the given attempt number."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _record(self, url, status, latency, size):
+        self.stats.record(status, latency, size)
+        for listener in self.listeners:
+            listener(url, status, latency, size)
+
+    def get(self, url, params=None, acquire=None):
+        """
+        Send a GET request, retrying transient failures.
+
+        Args:
+            url (str): The URL to request.
+            params (dict, optional): Query string parameters.
+            acquire (callable, optional): Called with no arguments before every
+                attempt, retries included, e.g. to take a rate limiter token.
+                Exceptions it raises propagate to the caller.
+
+        Returns:
+            requests.Response: The final response. 5xx responses are returned once
+                the retries are exhausted.
+
+        Raises:
+            requests.RequestException: If every attempt failed without a response.
+        """
+        attempt = 0
+        while True:
+            if acquire is not None:
+                acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(url, None, time.perf_counter() - started, 0)
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                # Body is read eagerly, so raw.tell() is the compressed wire size.
+                size = response.raw.tell() if response.raw is not None else len(response.content)
+                self._record(url, response.status_code, time.perf_counter() - started, size or len(response.content))
+                if response.status_code < 500 or attempt >= self.max_retries:
+                    return response
+
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+
+def http_client_from_env():
+    """
+    Create the default HTTP client from environment variables.
+
+    Returns:
+        HttpClient: The configured client.
+    """
+    return HttpClient(
+        connect_timeout=float(os.getenv('COMIC_VINE_CONNECT_TIMEOUT', 5.0)),
+        read_timeout=float(os.getenv('COMIC_VINE_READ_TIMEOUT', 30.0)),
+        max_retries=int(os.getenv('COMIC_VINE_MAX_RETRIES', 3)),
+        pool_size=int(os.getenv('COMIC_VINE_POOL_SIZE', 10)),
+    )
@@ -20,13 +20,21 @@
             - 'Availability' - Where are the TBPs available?
             - 'Storyline' - Optional, but will group series of the same storyline together. 
             - 'Story Order' - Reading order of given storyline.
-            - 'Status' - Read or Unread
+            - 'Status' - Read or Unread. Only applied when the comic is added;
+              after that the status set in the app wins over the file.
+
+    Re-importing a file only does work for rows that changed: every comic stores a
+    hash of the CSV row it was last imported from, and rows with the same hash are
+    skipped before any lookup or API call.
 
     Args:
         filepath (str): Path to the CSV file containing comic data.
+        streaming (bool): Commit in chunks and resume interrupted imports.
+        prune (bool): Delete comics that are no longer in the file.
 
     Returns:
-        None
+        dict: Counts of CSV 'rows' read and comics 'enriched', 'added', 'updated',
+            'unchanged' and 'removed'.
 
     Side Effects:
         - Prints updates for modified and newly added records.
@@ -42,37 +50,526 @@
 """
 
 import csv
+import hashlib
+import itertools
+import json
+import os
+import time
+from sqlalchemy import Column, Integer, MetaData, String, Table, and_, delete, func, insert, inspect, or_, select, \
+    tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from database import db
-from models import Comic
-from api_client import get_comic_issue_details  # Your Comic Vine API logic
+from models import Comic, ImportCheckpoint
+from api_client import ComicVineResolver, rate_limiter  # Your Comic Vine API logic
+from enrichment import DEFAULT_WORKERS, enrich_lookups
+from metrics import IMPORT_ROWS, IMPORT_ROWS_PER_SECOND
+from view_cache import bump_data_version
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Number of rows sent per bulk INSERT/UPDATE statement
+DEFAULT_CHUNK_SIZE = 500
+
+# Columns identifying a comic; backed by the uq_comics_natural_key index
+NATURAL_KEY = ('issue', 'issue_number', 'series_start_year')
+
+# Natural keys per lookup query (three bound parameters each)
+KEY_BATCH_SIZE = 1000
+
+# Dialects with native INSERT ... ON CONFLICT support
+UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+# Columns written by the import; the rest (e.g. cached cover paths) are maintained
+# elsewhere and left untouched by the upsert
+IMPORT_COLUMNS = (
+    'issue', 'issue_number', 'issue_title', 'series_start_year', 'issue_published_year',
+    'tbp', 'availability', 'storyline', 'story_order', 'status', 'cover_image_url', 'row_hash',
+)
+
+# CSV columns every row needs; together they form the natural key
+KEY_FIELDS = ['Issue', 'Issue Number', 'Series Start Year']
+
+# Optional CSV columns copied onto the comic: (CSV field, column, converter)
+CSV_FIELDS = [
+    ('Issue Published Year', 'issue_published_year', int),
+    ('TBP', 'tbp', str),
+    ('Availability', 'availability', str),
+    ('Storyline', 'storyline', str),
+    ('Story Order', 'story_order', int),
+    ('Status', 'status', str),
+]
+
+# CSV fields copied onto comics that already exist; their status belongs to the app
+UPDATE_FIELDS = [field for field in CSV_FIELDS if field[1] != 'status']
+
+# Scratch table for finding natural keys listed more than once in a streamed file
+_IMPORT_KEYS = Table(
+    'import_keys', MetaData(),
+    Column('issue', String), Column('issue_number', String), Column('series_start_year', Integer),
+    prefixes=['TEMPORARY'],
+)
+
+# CSV fields covered by a row's content hash
+HASHED_FIELDS = KEY_FIELDS + [field for field, _, _ in CSV_FIELDS]
+
+# Comics still missing details fetched from Comic Vine (see `_needs_api_details`)
+MISSING_DETAILS = or_(
+    Comic.__table__.c.cover_image_url.is_(None), Comic.__table__.c.cover_image_url == '',
+    Comic.__table__.c.issue_title.is_(None), Comic.__table__.c.issue_title == '',
+)
+
 
-def import_comics(filepath):
+def import_comics(filepath, max_workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE, streaming=False,
+                  progress=None, prune=False, enrich=True, rows=None, report_removed=False):
     """
     Import comics from a CSV file into the database, updating or adding records as necessary.
 
-    See docstring in the earlier analysis for detailed documentation.
+    The import runs in stages:
+        1. Parse and validate the CSV rows.
+        2. Skip rows whose content hash matches the hash stored with the comic
+           by an earlier import; they need no further DB or API work.
+        3. Load the matching existing comics and split the remaining rows into
+           inserts and updates.
+        4. Fetch missing details from the Comic Vine API concurrently (unless
+           `enrich` is off; `enrich_comics` can fill them in later).
+        5. Write with bulk INSERT ... ON CONFLICT upserts.
+
+    Comics that are not in the file are counted as 'removed', and deleted when
+    `prune` is set. Streaming imports only count them when pruning or when
+    `report_removed` is set, since that needs every natural key of the file.
+    Nothing is pruned if the file has no valid rows (e.g. a wrong header).
+
+    By default the whole file is handled in one transaction that is committed at
+    the end. In streaming mode the file is processed in chunks of `chunk_size`
+    rows and each chunk is committed together with a checkpoint (file hash and
+    row offset); running the import again on the same file resumes after the last
+    committed chunk. Memory use is bounded by the chunk size.
+
+    See the module docstring for the CSV format.
+
+    Args:
+        filepath (str): Path to the CSV file containing comic data.
+        max_workers (int): Number of threads used for Comic Vine lookups.
+        chunk_size (int): Number of rows per bulk statement, and per committed
+            chunk in streaming mode.
+        streaming (bool): Commit and checkpoint after every chunk.
+        progress (callable, optional): Called with the running summary dict after
+            every committed chunk (once at the end when not streaming).
+        prune (bool): Delete comics that are not in the file.
+        enrich (bool): Fetch missing details from Comic Vine.
+        rows (list, optional): The file's rows as returned by `read_csv`, when
+            they were already read (e.g. by another process). Not used in
+            streaming mode, which reads the file chunk by chunk.
+        report_removed (bool): Count comics not in the file in streaming mode
+            even without `prune`.
+
+    Returns:
+        dict: Counts of CSV 'rows' read and comics 'enriched', 'added', 'updated',
+            'unchanged' and 'removed' (not in the file; deleted if `prune`; None
+            if a streaming import did not count them).
+    """
+    started = time.perf_counter()
+    # One resolver per import so each series and volume issue list is fetched once
+    resolver = ComicVineResolver()
+
+    if streaming:
+        summary = _import_streaming(filepath, resolver, max_workers, chunk_size, progress, prune, enrich,
+                                    report_removed)
+    else:
+        if rows is None:
+            rows = read_csv(filepath)
+        _check_columns(rows[0].keys() if rows else KEY_FIELDS, filepath)
+        valid_rows = list(_valid_rows(rows))
+        stored = _load_row_hashes()
+        summary = _import_changed(valid_rows, stored, resolver, max_workers, chunk_size, enrich)
+        summary['rows'] = len(rows)
+        summary['removed'] = _handle_removed(stored, {_natural_key(row) for row in valid_rows}, prune, chunk_size)
+
+        # Commit all changes at once
+        bump_data_version()
+        db.session.commit()
+        if progress:
+            progress(summary)
+
+    removed = '' if summary['removed'] is None else \
+        f", {summary['removed']} {'removed' if prune else 'not in the file'}"
+    logger.info(
+        f"Comics successfully imported: {summary['added']} added, {summary['updated']} updated, "
+        f"{summary['unchanged']} unchanged{removed}."
+    )
+    elapsed = time.perf_counter() - started
+    if elapsed > 0:
+        IMPORT_ROWS_PER_SECOND.set(summary['rows'] / elapsed)
+    return summary
+
+
+def _import_streaming(filepath, resolver, max_workers, chunk_size, progress, prune, enrich, report_removed=False):
     """
-    with open(filepath, 'r', encoding='utf-8') as file:
+    Import a CSV file chunk by chunk, committing a checkpoint after each chunk.
+
+    Args:
+        filepath (str): Path to the CSV file containing comic data.
+        resolver (ComicVineResolver): Resolver shared across the import.
+        max_workers (int): Number of threads used for Comic Vine lookups.
+        chunk_size (int): Number of CSV rows per committed chunk.
+        progress (callable): Called with the running summary after each chunk, or None.
+        prune (bool): Delete comics that are not in the file once it is imported.
+        enrich (bool): Fetch missing details from Comic Vine.
+        report_removed (bool): Count comics not in the file even without `prune`.
+
+    Returns:
+        dict: Counts of CSV 'rows' read and comics 'enriched', 'added', 'updated'
+            and 'unchanged' for this run, and comics 'removed' from the file (None
+            unless `prune` or `report_removed` is set).
+    """
+    file_hash = _file_hash(filepath)
+    checkpoint = db.session.get(ImportCheckpoint, file_hash)
+    if checkpoint is None:
+        checkpoint = ImportCheckpoint(file_hash=file_hash, filename=os.path.basename(filepath), rows_done=0)
+        db.session.add(checkpoint)
+    rows_done = checkpoint.rows_done
+    if rows_done:
+        logger.info(f"Resuming import of {filepath} after row {rows_done}.")
+
+    summary = {'rows': 0, 'enriched': 0, 'added': 0, 'updated': 0, 'unchanged': 0, 'removed': None}
+    # Natural keys in the file, to find comics that are no longer listed. Only
+    # kept when needed: it grows with the file, unlike everything else here.
+    seen = set() if prune or report_removed else None
+    # A key listed in several chunks is hashed and written once, from all of its
+    # rows, after the last chunk; otherwise every run would rewrite it.
+    repeated = _repeated_keys(filepath, chunk_size)
+    deferred = []
+    # utf-8-sig drops the byte-order mark Excel puts in front of the header
+    with open(filepath, 'r', encoding='utf-8-sig') as file:
         reader = csv.DictReader(file)
+        _check_columns(reader.fieldnames or [], filepath)
+        skipped = itertools.islice(reader, rows_done)
+        if seen is None and not repeated:
+            for _ in skipped:
+                pass
+        else:
+            # Rows committed by an interrupted run still count as present in the
+            # file, and deferred rows were not committed with their chunk
+            for row in _valid_rows(skipped):
+                key = _natural_key(row)
+                if seen is not None:
+                    seen.add(key)
+                if key in repeated:
+                    deferred.append(row)
+
+        while True:
+            chunk = list(itertools.islice(reader, chunk_size))
+            if not chunk:
+                break
+
+            rows = []
+            for row in _valid_rows(chunk):
+                (deferred if _natural_key(row) in repeated else rows).append(row)
+            keys = {_natural_key(row) for row in rows}
+            if seen is not None:
+                seen.update(keys)
+            _add_counts(summary, _import_changed(rows, _load_row_hashes(keys), resolver, max_workers, chunk_size,
+                                                 enrich))
+            summary['rows'] += len(chunk)
+
+            # The checkpoint is committed atomically with the chunk it describes
+            rows_done += len(chunk)
+            checkpoint.rows_done = rows_done
+            bump_data_version()
+            db.session.commit()
+            if progress:
+                progress(summary)
+
+    if deferred:
+        keys = {_natural_key(row) for row in deferred}
+        if seen is not None:
+            seen.update(keys)
+        _add_counts(summary, _import_changed(deferred, _load_row_hashes(keys), resolver, max_workers, chunk_size,
+                                             enrich))
+        bump_data_version()
+        db.session.commit()
+        if progress:
+            progress(summary)
+
+    # The file is fully imported; a later run starts from the beginning again
+    if seen is not None:
+        summary['removed'] = _handle_removed(_load_row_hashes(), seen, prune, chunk_size)
+    if inspect(checkpoint).persistent:
+        db.session.delete(checkpoint)
+    else:
+        # No chunk was committed (e.g. a header-only file), so it was never flushed
+        db.session.expunge(checkpoint)
+    if prune and summary['removed']:
+        bump_data_version()
+    db.session.commit()
+    return summary
+
+
+def _repeated_keys(filepath, chunk_size):
+    """
+    Find the natural keys that a CSV file lists more than once.
 
-        for row in reader:
-            if not _validate_row(row):
-                logger.warning(f"Skipping invalid row: {row}")
-                continue
+    The keys are counted in a temporary table rather than in memory, so this
+    stays flat however large the file is.
 
-            existing_comic = _get_existing_comic(row)
-            if existing_comic:
-                _update_comic(existing_comic, row)
-            else:
-                _add_new_comic(row)
+    Args:
+        filepath (str): Path to the CSV file.
+        chunk_size (int): Number of keys per INSERT.
 
-        # Commit all changes at once
+    Returns:
+        set: The repeated natural keys.
+    """
+    with db.engine.begin() as connection, open(filepath, 'r', encoding='utf-8-sig') as file:
+        _IMPORT_KEYS.create(connection)
+        reader = csv.DictReader(file)
+        while True:
+            chunk = list(itertools.islice(reader, chunk_size))
+            if not chunk:
+                break
+            keys = [dict(zip(NATURAL_KEY, _natural_key(row))) for row in chunk if _validate_row(row)]
+            if keys:
+                connection.execute(insert(_IMPORT_KEYS), keys)
+        columns = [_IMPORT_KEYS.c[column] for column in NATURAL_KEY]
+        repeated = {
+            tuple(row) for row in connection.execute(select(*columns).group_by(*columns).having(func.count() > 1))
+        }
+        _IMPORT_KEYS.drop(connection)
+    return repeated
+
+
+def _import_changed(rows, stored, resolver, max_workers, chunk_size, enrich=True):
+    """
+    Import the rows whose natural key changed since the last import, without committing.
+
+    Args:
+        rows (list): Validated CSV rows, including every row of each natural key.
+        stored (dict): Stored row hashes for (at least) the rows' natural keys,
+            as returned by `_load_row_hashes`.
+        resolver (ComicVineResolver): Resolver shared across the import.
+        max_workers (int): Number of threads used for Comic Vine lookups.
+        chunk_size (int): Number of rows per bulk statement.
+        enrich (bool): Fetch missing details from Comic Vine.
+
+    Returns:
+        dict: Counts of comics 'enriched', 'added', 'updated' and 'unchanged';
+            unchanged comics include those skipped by their hash.
+    """
+    changed_rows = _changed_rows(rows, stored)
+    changed_keys = {_natural_key(row) for row in changed_rows}
+    summary = _import_rows(changed_rows, _load_existing_comics(changed_keys), resolver, max_workers, chunk_size,
+                           enrich)
+    summary['unchanged'] += len({_natural_key(row) for row in rows}) - len(changed_keys)
+    return summary
+
+
+def _add_counts(summary, counts):
+    """Add a batch's counts to the running summary."""
+    for count, value in counts.items():
+        summary[count] += value
+
+
+def _import_rows(rows, existing, resolver, max_workers, chunk_size, enrich=True):
+    """
+    Enrich and write a batch of validated CSV rows, without committing.
+
+    Args:
+        rows (list): Validated CSV rows.
+        existing (dict): Existing comics for (at least) the rows' natural keys,
+            as returned by `_load_existing_comics`.
+        resolver (ComicVineResolver): Resolver shared across the import.
+        max_workers (int): Number of threads used for Comic Vine lookups.
+        chunk_size (int): Number of rows per bulk statement.
+        enrich (bool): Fetch missing details from Comic Vine.
+
+    Returns:
+        dict: Counts of comics 'enriched', 'added', 'updated' and 'unchanged'
+            (matched an existing comic without changing it).
+    """
+    # Split rows into inserts and updates against the existing comics
+    inserts = {}
+    matched = {}
+    row_hashes = _key_hashes(rows)
+    for row in rows:
+        key = _natural_key(row)
+        if key in inserts:
+            # Rows repeated within the file update the record added for the first one
+            _merge_row(inserts[key], row)
+        elif key in existing:
+            _merge_row(matched.setdefault(key, dict(existing[key])), row, UPDATE_FIELDS)
+        else:
+            inserts[key] = _new_record(row)
+    # Compare the merged result, so a repeated key whose rows cancel out is unchanged
+    updated_keys = {key for key, record in matched.items() if record != existing[key]}
+
+    # Enrich records that are new or missing API details
+    issue_details = {}
+    if enrich:
+        lookups = {
+            _lookup_key(record)
+            for record in itertools.chain(inserts.values(), matched.values())
+            if _needs_api_details(record)
+        }
+        issue_details = enrich_lookups(lookups, resolver, max_workers)
+
+    enriched = 0
+    for record in inserts.values():
+        enriched += _apply_api_details(record, issue_details.get(_lookup_key(record)))
+    for key, record in matched.items():
+        if _apply_api_details(record, issue_details.get(_lookup_key(record))):
+            updated_keys.add(key)
+            enriched += 1
+
+    # Remember which CSV content each comic reflects. Comics still missing API
+    # details keep no hash, so the next import of the same row retries them.
+    for key, record in itertools.chain(inserts.items(), matched.items()):
+        record['row_hash'] = None if _needs_api_details(record) else row_hashes[key]
+    rehashed = {
+        key for key, record in matched.items()
+        if key not in updated_keys and record['row_hash'] != existing[key]['row_hash']
+    }
+
+    # Bulk write
+    _bulk_upsert(list(inserts.values()), [matched[key] for key in updated_keys | rehashed], chunk_size)
+    unchanged = len(matched) - len(updated_keys)
+    IMPORT_ROWS.inc(len(inserts), result='added')
+    IMPORT_ROWS.inc(len(updated_keys), result='updated')
+    IMPORT_ROWS.inc(unchanged, result='unchanged')
+    return {'enriched': enriched, 'added': len(inserts), 'updated': len(updated_keys), 'unchanged': unchanged}
+
+
+def enrich_comics(max_workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE, batch_size=5000, limit=None,
+                  progress=None, series=None, resolver=None):
+    """
+    Fetch missing Comic Vine details for comics already in the database.
+
+    This is the enrichment stage of `import_comics` run on its own, for comics
+    imported with `enrich=False` or whose lookups failed or hit the rate limit.
+    Comics are handled in id order, `batch_size` at a time, and every batch is
+    committed, so an interrupted pass keeps what it fetched.
+
+    Args:
+        max_workers (int): Number of threads used for Comic Vine lookups.
+        chunk_size (int): Number of rows per bulk UPDATE statement.
+        batch_size (int): Number of comics looked up and committed together.
+        limit (int, optional): Stop after this many comics.
+        progress (callable, optional): Called with the running summary dict after
+            every committed batch.
+        series (tuple, optional): (series name, start year) to only enrich the
+            comics of one volume.
+        resolver (ComicVineResolver, optional): Resolver to use, e.g. one that
+            already holds the volume's issue list.
+
+    Returns:
+        dict: Counts of comics 'checked' (missing details) and 'enriched'.
+    """
+    comics = Comic.__table__
+    missing = MISSING_DETAILS
+    if series is not None:
+        missing = and_(missing, comics.c.issue == series[0], comics.c.series_start_year == series[1])
+    resolver = resolver or ComicVineResolver()
+    summary = {'checked': 0, 'enriched': 0}
+    last_id = 0
+    while limit is None or summary['checked'] < limit:
+        count = batch_size if limit is None else min(batch_size, limit - summary['checked'])
+        records = [
+            dict(comic) for comic in db.session.execute(
+                select(comics).where(missing, comics.c.id > last_id).order_by(comics.c.id).limit(count)
+            ).mappings()
+        ]
+        if not records:
+            break
+        last_id = records[-1]['id']
+
+        issue_details = enrich_lookups({_lookup_key(record) for record in records}, resolver, max_workers)
+        updates = [
+            {'id': record['id'], 'issue_title': record['issue_title'], 'cover_image_url': record['cover_image_url']}
+            for record in records
+            if _apply_api_details(record, issue_details.get(_lookup_key(record)))
+        ]
+        _bulk_update(updates, chunk_size)
+        if updates:
+            bump_data_version()
         db.session.commit()
-        logger.info("Comics successfully imported.")
+
+        summary['checked'] += len(records)
+        summary['enriched'] += len(updates)
+        if progress:
+            progress(summary)
+        if rate_limiter.blocked:
+            logger.warning("Comic Vine rate limit reached; run the enrichment again later.")
+            break
+
+    logger.info(f"Enriched {summary['enriched']} of {summary['checked']} comics missing details.")
+    return summary
+
+
+def read_csv(filepath):
+    """
+    Read every row of a comics CSV file.
+
+    Args:
+        filepath (str): Path to the CSV file.
+
+    Returns:
+        list: One dict per row, keyed by the header fields.
+    """
+    # utf-8-sig drops the byte-order mark Excel puts in front of the header
+    with open(filepath, 'r', encoding='utf-8-sig') as file:
+        return list(csv.DictReader(file))
+
+
+def _check_columns(fieldnames, filepath):
+    """
+    Log an error if a CSV header lacks any of the `KEY_FIELDS`.
+
+    Every row of such a file is invalid, so nothing is imported (or pruned).
+
+    Args:
+        fieldnames (iterable): The header fields of the file.
+        filepath (str): Path to the CSV file, for the message.
+
+    Returns:
+        bool: True if all key columns are present.
+    """
+    missing = [field for field in KEY_FIELDS if field not in fieldnames]
+    if missing:
+        logger.error(f"{filepath} is missing the required columns: {', '.join(missing)}.")
+    return not missing
+
+
+def _file_hash(filepath):
+    """
+    Compute the SHA-256 of a file without loading it into memory.
+
+    Args:
+        filepath (str): Path to the file.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _valid_rows(rows):
+    """
+    Yield the rows that pass validation, logging the ones that do not.
+
+    Args:
+        rows (iterable): Rows from a `csv.DictReader`.
+
+    Yields:
+        dict: Valid CSV rows.
+    """
+    for row in rows:
+        if not _validate_row(row):
+            logger.warning(f"Skipping invalid row: {row}")
+            continue
+        yield row
 
 
 def _validate_row(row):
@@ -85,106 +582,315 @@ def _validate_row(row):
     Returns:
         bool: True if the row is valid, False otherwise.
     """
-    return all(row.get(field) for field in ['Issue', 'Issue Number', 'Series Start Year'])
+    return all(row.get(field) for field in KEY_FIELDS)
+
+
+def _natural_key(row):
+    """
+    Build the natural key identifying a comic from a CSV row.
+
+    Args:
+        row (dict): A dictionary representing a row from the CSV file.
+
+    Returns:
+        tuple: (issue, issue_number, series_start_year).
+    """
+    return row['Issue'], row['Issue Number'], int(row['Series Start Year'])
 
 
-def _get_existing_comic(row):
+def _row_hash(row):
     """
-    Retrieve an existing comic from the database based on CSV row data.
+    Hash the CSV content of a row.
 
     Args:
         row (dict): A dictionary representing a row from the CSV file.
 
     Returns:
-        Comic: The existing comic instance or None if not found.
+        str: Hex SHA-1 digest of the row's `HASHED_FIELDS` values.
+    """
+    values = [row.get(field) or '' for field in HASHED_FIELDS]
+    return hashlib.sha1(json.dumps(values).encode('utf-8')).hexdigest()
+
+
+def _key_hashes(rows):
+    """
+    Hash the CSV content of every natural key in a batch of rows.
+
+    A key listed once gets its `_row_hash`. A key repeated within the batch gets
+    one hash over all of its rows in file order, so importing the same file again
+    finds it unchanged. Streaming imports defer repeated keys to one final batch,
+    so their rows are hashed together there too.
+
+    Args:
+        rows (list): Validated CSV rows.
+
+    Returns:
+        dict: Maps natural keys to hex SHA-1 digests.
+    """
+    hashes = {}
+    for row in rows:
+        key = _natural_key(row)
+        row_hash = _row_hash(row)
+        if key in hashes:
+            row_hash = hashlib.sha1((hashes[key] + row_hash).encode('utf-8')).hexdigest()
+        hashes[key] = row_hash
+    return hashes
+
+
+def _changed_rows(rows, stored):
+    """
+    Drop the rows of natural keys whose content is already stored.
+
+    Args:
+        rows (list): Validated CSV rows.
+        stored (dict): Natural keys mapped to (id, row_hash), as returned by
+            `_load_row_hashes`.
+
+    Returns:
+        list: Every row of the keys that are new or differ from the last import.
+    """
+    changed = {
+        key for key, key_hash in _key_hashes(rows).items()
+        if key not in stored or stored[key][1] != key_hash
+    }
+    return [row for row in rows if _natural_key(row) in changed]
+
+
+def _lookup_key(record):
+    """
+    Build the Comic Vine lookup tuple for a comic record.
+
+    Args:
+        record (dict): Column values of a comic.
+
+    Returns:
+        tuple: (series_name, start_year, issue_number).
+    """
+    return record['issue'], record['series_start_year'], record['issue_number']
+
+
+def _select_comics(query, keys):
     """
-    return Comic.query.filter_by(
-        issue=row['Issue'],
-        issue_number=row['Issue Number'],
-        series_start_year=int(row['Series Start Year'])
-    ).first()
+    Run a SELECT on comics, restricted to the given natural keys if any.
 
+    The keys are sent in batches of `KEY_BATCH_SIZE`, so a whole file's worth
+    of keys stays under SQLite's bound-parameter limit.
 
-def _update_comic(comic, row):
+    Args:
+        query (Select): The query to run.
+        keys (set): Natural keys to load, or None for every comic.
+
+    Yields:
+        Row: The selected rows.
+    """
+    if keys is None:
+        yield from db.session.execute(query)
+        return
+    natural_key = tuple_(*(Comic.__table__.c[column] for column in NATURAL_KEY))
+    for batch in _chunks(list(keys), KEY_BATCH_SIZE):
+        yield from db.session.execute(query.where(natural_key.in_(batch)))
+
+
+def _load_existing_comics(keys=None):
     """
-    Update an existing comic record with data from the CSV row.
+    Load existing comics with column-only queries.
+
+    Args:
+        keys (set, optional): Natural keys to load. All comics are loaded if omitted.
+
+    Returns:
+        dict: Maps natural keys to dicts of column values (including 'id').
+    """
+    return {
+        (comic['issue'], comic['issue_number'], comic['series_start_year']): comic
+        for comic in (row._mapping for row in _select_comics(select(Comic.__table__), keys))
+    }
+
+
+def _load_row_hashes(keys=None):
+    """
+    Load the id and stored row hash of existing comics.
+
+    Args:
+        keys (set, optional): Natural keys to load. All comics are loaded if omitted.
+
+    Returns:
+        dict: Maps natural keys to (id, row_hash) tuples.
+    """
+    comics = Comic.__table__
+    query = select(*(comics.c[column] for column in NATURAL_KEY), comics.c.id, comics.c.row_hash)
+    return {
+        (issue, issue_number, series_start_year): (comic_id, row_hash)
+        for issue, issue_number, series_start_year, comic_id, row_hash in _select_comics(query, keys)
+    }
+
+
+def _handle_removed(stored, seen, prune, chunk_size):
+    """
+    Count, and optionally delete, comics that are not in the imported file.
+
+    Args:
+        stored (dict): Every existing comic, as returned by `_load_row_hashes()`.
+        seen (set): Natural keys found in the file.
+        prune (bool): Delete the missing comics.
+        chunk_size (int): Number of ids per DELETE statement.
+
+    Returns:
+        int: The number of comics not in the file, or 0 if pruning was refused.
+    """
+    removed = [comic_id for key, (comic_id, _) in stored.items() if key not in seen]
+    if prune and not seen:
+        # An empty, unreadable or wrongly formatted file would delete everything
+        logger.error(f"Not removing {len(removed)} comics: the file has no valid rows.")
+        return 0
+    if prune:
+        for chunk in _chunks(removed, chunk_size):
+            db.session.execute(delete(Comic.__table__).where(Comic.__table__.c.id.in_(chunk)))
+        if removed:
+            logger.info(f"Removed {len(removed)} comics that are no longer in the file.")
+    return len(removed)
+
+
+def _new_record(row):
+    """
+    Build the column values for a new comic from CSV row data.
 
     Args:
-        comic (Comic): The comic instance to update.
         row (dict): A dictionary representing a row from the CSV file.
+
+    Returns:
+        dict: Column values for a bulk INSERT.
     """
-    updated_fields = {}
+    record = {
+        'issue': row['Issue'],
+        'issue_number': row['Issue Number'],
+        'issue_title': None,
+        'series_start_year': int(row['Series Start Year']),
+        'issue_published_year': 0,
+        'tbp': None,
+        'availability': None,
+        'storyline': None,
+        'story_order': 0,
+        'status': 'Unread',
+        'cover_image_url': None,
+        'row_hash': None,
+    }
+    _merge_row(record, row)
+    return record
+
+
+def _merge_row(record, row, fields=CSV_FIELDS):
+    """
+    Copy non-empty CSV values that differ onto a comic record.
+
+    Args:
+        record (dict): Column values of a comic, updated in place.
+        row (dict): A dictionary representing a row from the CSV file.
+        fields (list): The (CSV field, column, converter) triples to copy;
+            `UPDATE_FIELDS` for comics that already exist.
 
-    # Compare and update fields
-    for field, db_field in [
-        ('Issue Published Year', 'issue_published_year'),
-        ('TBP', 'tbp'),
-        ('Availability', 'availability'),
-        ('Storyline', 'storyline'),
-        ('Story Order', 'story_order'),
-        ('Status', 'status'),
-    ]:
+    Returns:
+        dict: The fields that changed.
+    """
+    updated_fields = {}
+    for field, db_field, convert in fields:
         new_value = row.get(field)
-        if new_value and getattr(comic, db_field) != new_value:
-            setattr(comic, db_field, int(new_value) if db_field == 'issue_published_year' else new_value)
+        if not new_value:
+            continue
+        new_value = convert(new_value)
+        if record.get(db_field) != new_value:
+            record[db_field] = new_value
             updated_fields[db_field] = new_value
 
-    # Fetch additional details if necessary
-    _fetch_and_update_api_details(comic, row, updated_fields)
+    if updated_fields and 'id' in record:
+        logger.debug(f"Updated comic {record['issue']} #{record['issue_number']}: {updated_fields}")
+    return updated_fields
+
 
-    if updated_fields:
-        logger.info(f"Updated comic {comic.issue} #{comic.issue_number}: {updated_fields}")
+def _needs_api_details(record):
+    """Return True if the record is missing details fetched from Comic Vine."""
+    return not record.get('cover_image_url') or not record.get('issue_title')
 
 
-def _add_new_comic(row):
+def _apply_api_details(record, issue_details):
     """
-    Add a new comic record to the database based on CSV row data.
+    Fill in missing details on a comic record from Comic Vine data.
 
     Args:
-        row (dict): A dictionary representing a row from the CSV file.
+        record (dict): Column values of a comic, updated in place.
+        issue_details (dict): Comic Vine details for the comic, or None.
+
+    Returns:
+        bool: True if any field was filled in.
     """
-    issue_details = get_comic_issue_details(
-        series_name=row['Issue'],
-        start_year=int(row['Series Start Year']),
-        issue_number=row['Issue Number']
-    )
+    if not issue_details:
+        return False
+
+    updated = False
+    if not record.get('cover_image_url') and issue_details.get('image_url'):
+        record['cover_image_url'] = issue_details.get('image_url')
+        updated = True
+    if not record.get('issue_title') and issue_details.get('name'):
+        record['issue_title'] = issue_details.get('name')
+        updated = True
+    return updated
+
+
+def _chunks(records, chunk_size):
+    """Yield successive slices of `records` with at most `chunk_size` items."""
+    for start in range(0, len(records), chunk_size):
+        yield records[start:start + chunk_size]
+
+
+def _bulk_upsert(inserts, updates, chunk_size):
+    """
+    Write new and changed comics with native INSERT ... ON CONFLICT DO UPDATE.
 
-    comic = Comic(
-        issue=row['Issue'],
-        issue_number=row['Issue Number'],
-        issue_title=issue_details.get('name') if issue_details else None,
-        series_start_year=int(row['Series Start Year']),
-        issue_published_year=int(row.get('Issue Published Year') or 0),
-        tbp=row.get('TBP'),
-        availability=row.get('Availability'),
-        storyline=row.get('Storyline'),
-        story_order=int(row.get('Story Order') or 0),
-        status=row.get('Status', 'Unread'),
-        cover_image_url=issue_details.get('image_url') if issue_details else None
+    Conflicts are resolved on the natural key, so a comic inserted concurrently by
+    another import is updated rather than duplicated. Databases without native
+    upsert support fall back to separate bulk INSERT and UPDATE statements.
+
+    Args:
+        inserts (list): Column values for each new comic.
+        updates (list): Column values for each changed comic, including 'id'.
+        chunk_size (int): Number of rows per statement.
+    """
+    dialect_insert = UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if dialect_insert is None:
+        _bulk_insert(inserts, chunk_size)
+        _bulk_update(updates, chunk_size)
+        return
+
+    comics = Comic.__table__
+    stmt = dialect_insert(comics)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[comics.c[column] for column in NATURAL_KEY],
+        set_={column: stmt.excluded[column] for column in IMPORT_COLUMNS if column not in NATURAL_KEY},
     )
-    db.session.add(comic)
-    logger.info(f"Added new comic: {comic.issue} #{comic.issue_number}")
+    records = [{column: record[column] for column in IMPORT_COLUMNS} for record in inserts + updates]
+    for chunk in _chunks(records, chunk_size):
+        db.session.execute(stmt, chunk)
 
 
-def _fetch_and_update_api_details(comic, row, updated_fields):
+def _bulk_insert(records, chunk_size):
     """
-    Fetch missing details from the Comic Vine API and update the comic instance.
+    Insert new comics with executemany-style bulk INSERT statements.
 
     Args:
-        comic (Comic): The comic instance to update.
-        row (dict): A dictionary representing a row from the CSV file.
-        updated_fields (dict): Dictionary to track updated fields.
-    """
-    if not comic.cover_image_url or not comic.issue_title:
-        issue_details = get_comic_issue_details(
-            series_name=row['Issue'],
-            start_year=int(row['Series Start Year']),
-            issue_number=row['Issue Number']
-        )
-        if issue_details:
-            if not comic.cover_image_url:
-                comic.cover_image_url = issue_details.get('image_url')
-                updated_fields['cover_image_url'] = issue_details.get('image_url')
-            if not comic.issue_title:
-                comic.issue_title = issue_details.get('name')
-                updated_fields['issue_title'] = issue_details.get('name')
+        records (list): Column values for each new comic.
+        chunk_size (int): Number of rows per statement.
+    """
+    for chunk in _chunks(records, chunk_size):
+        db.session.execute(insert(Comic), chunk)
+
+
+def _bulk_update(records, chunk_size):
+    """
+    Update existing comics with bulk UPDATE ... WHERE id = ? statements.
+
+    Args:
+        records (list): Column values for each changed comic, including 'id'.
+        chunk_size (int): Number of rows per statement.
+    """
+    for chunk in _chunks(records, chunk_size):
+        db.session.execute(update(Comic), chunk)
@@ -0,0 +1,243 @@
+"""
+    In-process background job queue for CSV imports.
+
+    Uploads are queued as `ImportJob` rows and run on a small worker thread pool,
+    so the `/upload` request returns immediately with a job id instead of holding a
+    Flask worker for the whole import. Jobs use the streaming import mode, so each
+    chunk is committed and progress is visible while the job runs; jobs left
+    unfinished by a restart are resumed from their last checkpoint. Once an import
+    finishes, the new covers are downloaded and thumbnailed by a separate
+    single-thread backfill worker, so queued imports never wait behind it.
+
+    Environment variables:
+        - IMPORT_JOB_WORKERS: Number of imports that may run at once (default 1;
+          SQLite serializes writers anyway).
+"""
+
+import csv
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from api_client import http_client
+from covers import cache_missing_covers
+from database import db
+from import_data import import_comics
+from models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('IMPORT_JOB_WORKERS', 1)),
+    thread_name_prefix='import-job',
+)
+
+# Cover downloads run apart from imports; at most one backfill waits in the queue
+cover_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cover-backfill')
+_cover_backfill_lock = threading.Lock()
+_cover_backfill_queued = False
+
+
+def submit_import(app, filepath, prune=False, filename=None):
+    """
+    Queue a CSV file for import in the background.
+
+    The job takes ownership of the file and deletes it once the import has
+    completed or failed.
+
+    Args:
+        app (Flask): The application, used to push an app context in the worker.
+        filepath (str): Path to the uploaded CSV file.
+        prune (bool): Delete comics that are not in the file.
+        filename (str, optional): Name to report for the job; defaults to the
+            file's name on disk.
+
+    Returns:
+        int: The id of the new job.
+    """
+    job = ImportJob(filename=filename or os.path.basename(filepath), filepath=filepath, status='queued',
+                    prune=prune)
+    db.session.add(job)
+    db.session.commit()
+    executor.submit(_run_import, app, job.id)
+    return job.id
+
+
+def resume_unfinished_jobs(app):
+    """
+    Re-queue jobs that were queued or running when the process last stopped.
+
+    Must be called inside an application context.
+
+    Args:
+        app (Flask): The application, used to push an app context in the worker.
+    """
+    for job in ImportJob.query.filter(ImportJob.status.in_(['queued', 'running'])).all():
+        logger.info(f"Resuming import job {job.id} ({job.filename}).")
+        executor.submit(_run_import, app, job.id)
+
+    # Files left behind by jobs that finished, e.g. when the process stopped
+    # right after recording the outcome
+    for job in ImportJob.query.filter(ImportJob.status.in_(['completed', 'failed'])).all():
+        _remove_upload(job.filepath)
+
+    # Pick up covers that were not cached before the last shutdown
+    schedule_cover_backfill(app)
+
+
+def schedule_cover_backfill(app):
+    """
+    Queue a cover backfill, unless one is already waiting to start.
+
+    A backfill scans for every missing cover when it starts, so one queued run
+    covers all the requests made before it.
+
+    Args:
+        app (Flask): The application, used to push an app context in the worker.
+    """
+    global _cover_backfill_queued
+    with _cover_backfill_lock:
+        if _cover_backfill_queued:
+            return
+        _cover_backfill_queued = True
+    cover_executor.submit(_run_cover_backfill, app)
+
+
+def _run_cover_backfill(app):
+    """
+    Cache any covers that are not stored locally yet.
+
+    Args:
+        app (Flask): The application.
+    """
+    global _cover_backfill_queued
+    with _cover_backfill_lock:
+        # Requests from now on need another run, which may find new covers
+        _cover_backfill_queued = False
+    with app.app_context():
+        try:
+            cache_missing_covers()
+        except Exception as e:
+            logger.error(f"Cover caching failed: {e}")
+            db.session.rollback()
+
+
+def _run_import(app, job_id):
+    """
+    Run an import job in a worker thread, recording its progress.
+
+    Args:
+        app (Flask): The application.
+        job_id (int): The job to run.
+    """
+    with app.app_context():
+        job = db.session.get(ImportJob, job_id)
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+
+        # Calls made by other threads in the meantime are counted as well; with a
+        # single job worker that is only the occasional page-triggered call.
+        api_calls_before = http_client.stats.snapshot()['calls']
+        # A resumed job continues its counters from the last checkpoint
+        rows_before, enriched_before, written_before = job.rows_parsed, job.rows_enriched, job.rows_written
+        unchanged_before = job.rows_unchanged or 0
+
+        def on_progress(summary):
+            job.rows_parsed = rows_before + summary['rows']
+            job.rows_enriched = enriched_before + summary['enriched']
+            job.rows_written = written_before + summary['added'] + summary['updated']
+            job.rows_unchanged = unchanged_before + summary['unchanged']
+            job.api_calls = http_client.stats.snapshot()['calls'] - api_calls_before
+            db.session.commit()
+
+        try:
+            # Inside the try, so an unreadable file fails the job instead of
+            # leaving it running
+            job.total_rows = _count_rows(job.filepath)
+            db.session.commit()
+            summary = import_comics(job.filepath, streaming=True, progress=on_progress, prune=bool(job.prune))
+            job.rows_removed = summary['removed']
+            job.status = 'completed'
+        except Exception as e:
+            logger.error(f"Import job {job_id} failed: {e}")
+            db.session.rollback()
+            job.status = 'failed'
+            job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        # Finished jobs are never run again, whatever the outcome. A job cut off
+        # by a restart keeps its file, since it resumes from its checkpoint.
+        _remove_upload(job.filepath)
+
+        if job.status == 'completed':
+            schedule_cover_backfill(app)
+
+
+def _remove_upload(filepath):
+    """
+    Delete an import job's uploaded file, if it still exists.
+
+    Args:
+        filepath (str): Path to the uploaded CSV file.
+    """
+    try:
+        os.remove(filepath)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove uploaded file {filepath}: {e}")
+
+
+def _count_rows(filepath):
+    """
+    Count the CSV data rows in a file.
+
+    Args:
+        filepath (str): Path to the CSV file.
+
+    Returns:
+        int: Number of rows, excluding the header.
+    """
+    with open(filepath, 'r', encoding='utf-8-sig', newline='') as file:
+        return max(sum(1 for _ in csv.reader(file)) - 1, 0)
+
+
+def job_status(job):
+    """
+    Describe a job's progress for the `/jobs/<id>` endpoint.
+
+    Args:
+        job (ImportJob): The job.
+
+    Returns:
+        dict: Job state, progress counters and the estimated seconds remaining
+            ('eta_seconds', None until it can be estimated).
+    """
+    eta = None
+    if job.status == 'running' and job.started_at and job.rows_parsed and job.total_rows:
+        elapsed = (datetime.utcnow() - job.started_at).total_seconds()
+        eta = round(elapsed / job.rows_parsed * max(job.total_rows - job.rows_parsed, 0), 1)
+    elif job.status == 'completed':
+        eta = 0
+
+    return {
+        'id': job.id,
+        'filename': job.filename,
+        'status': job.status,
+        'total_rows': job.total_rows,
+        'rows_parsed': job.rows_parsed,
+        'rows_enriched': job.rows_enriched,
+        'rows_written': job.rows_written,
+        'rows_unchanged': job.rows_unchanged,
+        'rows_removed': job.rows_removed,
+        'prune': bool(job.prune),
+        'api_calls': job.api_calls,
+        'eta_seconds': eta,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -0,0 +1,273 @@
+"""
+    Lightweight in-process metrics in the Prometheus text exposition format.
+
+    Counters, gauges and histograms are kept in memory, labelled, thread-safe and
+    rendered by `render()` for the `/metrics` endpoint. Nothing here depends on
+    Flask, so the importer and API client can record metrics when used on their
+    own as well.
+
+    Recorded metrics:
+        - comictracker_api_requests_total / comictracker_api_request_seconds:
+          Comic Vine HTTP attempts and their latency, by resource and status.
+        - comictracker_api_cache_requests_total: Response cache hits and misses.
+        - comictracker_http_requests_total / comictracker_http_request_seconds:
+          Requests served by the app, by endpoint.
+        - comictracker_http_request_db_queries / comictracker_http_request_db_seconds:
+          SQL statements executed per request and the time spent in them.
+        - comictracker_render_seconds: Time to render a view on a view cache miss.
+        - comictracker_import_rows_total, comictracker_import_rows_per_second:
+          Rows imported, and the throughput of the last import.
+
+    Metrics are per process and reset when the app restarts.
+"""
+
+import bisect
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class holding one value per combination of label values."""
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        """Return the metric in the Prometheus text format."""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._sample_lines(key, value))
+        return '\n'.join(lines)
+
+    def _sample_lines(self, key, value):
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}']
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Add `amount` to the counter for the given label values."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Current value for the given label values."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """A value that can be set to anything."""
+
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        """Set the gauge for the given label values."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation for the given label values."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block, in seconds."""
+        return _Timer(self, labels)
+
+    def _sample_lines(self, key, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state['buckets']):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+        lines.append(f'{self.name}_bucket{labels} {state["count"]}')
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f'{self.name}_sum{labels} {_format_value(state["sum"])}')
+        lines.append(f'{self.name}_count{labels} {state["count"]}')
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._started, **self._labels)
+
+
+class Registry:
+    """The set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric and return it."""
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Render every metric in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics)
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+registry = Registry()
+
+API_REQUESTS = registry.register(Counter(
+    'comictracker_api_requests_total', 'Comic Vine HTTP attempts, including retries.', ('resource', 'status')))
+API_LATENCY = registry.register(Histogram(
+    'comictracker_api_request_seconds', 'Latency of Comic Vine HTTP attempts.', ('resource',)))
+API_CACHE = registry.register(Counter(
+    'comictracker_api_cache_requests_total', 'Comic Vine response cache lookups.', ('resource', 'result')))
+HTTP_REQUESTS = registry.register(Counter(
+    'comictracker_http_requests_total', 'Requests served by the app.', ('endpoint', 'status')))
+HTTP_LATENCY = registry.register(Histogram(
+    'comictracker_http_request_seconds', 'Time to serve a request.', ('endpoint',)))
+HTTP_DB_QUERIES = registry.register(Histogram(
+    'comictracker_http_request_db_queries', 'SQL statements executed per request.', ('endpoint',),
+    buckets=COUNT_BUCKETS))
+HTTP_DB_SECONDS = registry.register(Histogram(
+    'comictracker_http_request_db_seconds', 'Time spent executing SQL per request.', ('endpoint',)))
+RENDER_SECONDS = registry.register(Histogram(
+    'comictracker_render_seconds', 'Time to render a view on a view cache miss.', ('view',)))
+IMPORT_ROWS = registry.register(Counter(
+    'comictracker_import_rows_total', 'CSV rows imported, by outcome.', ('result',)))
+IMPORT_ROWS_PER_SECOND = registry.register(Gauge(
+    'comictracker_import_rows_per_second', 'CSV rows per second of the last finished import.'))
+PREFETCH_TASKS = registry.register(Counter(
+    'comictracker_prefetch_tasks_total', 'Prefetch queue tasks run, by outcome.', ('result',)))
+PREFETCH_QUEUE = registry.register(Gauge(
+    'comictracker_prefetch_queue_due', 'Prefetch queue tasks due at the last queue refresh.'))
+
+
+def record_api_call(resource, status, latency):
+    """
+    Record one Comic Vine HTTP attempt.
+
+    Args:
+        resource (str): The Comic Vine resource name (e.g. 'issues').
+        status (int): HTTP status code, or None if no response was received.
+        latency (float): Seconds spent on the attempt.
+    """
+    API_REQUESTS.inc(resource=resource, status=status if status is not None else 'error')
+    API_LATENCY.observe(latency, resource=resource)
+
+
+class QueryTracker:
+    """
+    Count SQL statements and the time spent in them on the current thread.
+
+    Only threads between `start()` and `stop()` are tracked, so background
+    imports do not inflate the numbers of a concurrent request.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def start(self):
+        """Begin tracking statements on this thread."""
+        self._local.stats = [0, 0.0]
+
+    def stop(self):
+        """
+        Stop tracking on this thread.
+
+        Returns:
+            tuple: (statements, seconds) executed since `start()`.
+        """
+        stats = getattr(self._local, 'stats', None) or [0, 0.0]
+        self._local.stats = None
+        return stats[0], stats[1]
+
+    def before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'stats', None) is not None:
+            self._local.started = time.perf_counter()
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stats = getattr(self._local, 'stats', None)
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += time.perf_counter() - self._local.started
+
+
+query_tracker = QueryTracker()
+event.listen(Engine, 'before_cursor_execute', query_tracker.before_execute)
+event.listen(Engine, 'after_cursor_execute', query_tracker.after_execute)
+
+
+def render():
+    """Render every registered metric in the Prometheus text format."""
+    return registry.render()
@@ -0,0 +1,137 @@
+"""
+    In-place schema upgrades for existing comics databases.
+
+    `db.create_all()` only creates missing tables; it never alters a table that
+    already exists. `upgrade_database` brings databases created by older versions
+    of the app up to date and is safe to run on every startup.
+"""
+
+import itertools
+import logging
+
+from sqlalchemy import and_, func, inspect, select, text
+
+from database import db
+from models import Comic
+from search import create_search_index
+from view_cache import create_data_version
+
+logger = logging.getLogger(__name__)
+
+NATURAL_KEY = ('issue', 'issue_number', 'series_start_year')
+
+# Columns a dropped duplicate can contribute to the row that is kept, when the
+# kept row has no value of its own. Cover columns are copied as a group.
+MERGED_COLUMNS = ('issue_title', 'issue_published_year', 'tbp', 'availability', 'storyline', 'story_order')
+COVER_COLUMNS = ('cover_image_url', 'cover_path', 'cover_thumb_path', 'cover_width', 'cover_height')
+
+
+def upgrade_database():
+    """
+    Apply any missing schema changes to the current database.
+
+    Must be called inside an application context, after `db.create_all()`.
+    Also creates the full-text search index, see `search.create_search_index`,
+    and the shared data version row, see `view_cache.create_data_version`.
+    """
+    _add_missing_columns()
+    _fill_story_order()
+
+    existing_indexes = {index['name'] for index in inspect(db.engine).get_indexes(Comic.__tablename__)}
+
+    if 'uq_comics_natural_key' not in existing_indexes:
+        _remove_duplicate_comics()
+
+    for index in Comic.__table__.indexes:
+        if index.name not in existing_indexes:
+            index.create(db.engine)
+            logger.info(f"Created index {index.name}.")
+
+    create_search_index()
+    create_data_version()
+
+
+def _add_missing_columns():
+    """
+    Add columns introduced after a table was created.
+
+    New columns are always nullable, so `ALTER TABLE ... ADD COLUMN` is enough.
+    """
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            db.session.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            logger.info(f"Added column {table.name}.{column.name}.")
+    db.session.commit()
+
+
+def _fill_story_order():
+    """
+    Give comics without a story order the default of 0.
+
+    Imports always store one, but older databases may hold NULLs, which the
+    storyline pages would list before the comics ordered 0.
+    """
+    comics = Comic.__table__
+    result = db.session.execute(comics.update().where(comics.c.story_order.is_(None)).values(story_order=0))
+    db.session.commit()
+    if result.rowcount:
+        logger.info(f"Set the story order of {result.rowcount} comics to 0.")
+
+
+def _remove_duplicate_comics():
+    """
+    Delete rows that would violate the natural-key unique index.
+
+    Older imports could store the same (issue, issue_number, series_start_year)
+    more than once; the earliest row of each group is kept. Before the others
+    are deleted their data is merged into it: the comic is 'Read' if any copy
+    was, and details the kept row lacks (title, cover, story order, ...) are
+    taken from the first copy that has them. Every dropped row is logged.
+    """
+    comics = Comic.__table__
+    key_columns = [comics.c[column] for column in NATURAL_KEY]
+    duplicated = select(*key_columns).group_by(*key_columns).having(func.count() > 1).subquery()
+    rows = db.session.execute(
+        select(comics)
+        .join(duplicated, and_(*(comics.c[column] == duplicated.c[column] for column in NATURAL_KEY)))
+        .order_by(*key_columns, comics.c.id)
+    ).mappings().all()
+
+    removed = 0
+    for _, group in itertools.groupby(rows, key=lambda row: tuple(row[column] for column in NATURAL_KEY)):
+        kept, *dropped = group
+        values = {}
+        if kept['status'] != 'Read' and any(row['status'] == 'Read' for row in dropped):
+            values['status'] = 'Read'
+        for column in MERGED_COLUMNS:
+            if not kept[column]:
+                value = next((row[column] for row in dropped if row[column]), None)
+                if value:
+                    values[column] = value
+        if not kept['cover_image_url'] and not kept['cover_path']:
+            donor = next((row for row in dropped if row['cover_image_url'] or row['cover_path']), None)
+            if donor is not None:
+                values.update({column: donor[column] for column in COVER_COLUMNS})
+        merged = ', '.join(sorted(values))
+        if values:
+            # The kept row's content no longer matches any CSV row hash
+            values['row_hash'] = None
+            db.session.execute(comics.update().where(comics.c.id == kept['id']).values(**values))
+        dropped_ids = [row['id'] for row in dropped]
+        db.session.execute(comics.delete().where(comics.c.id.in_(dropped_ids)))
+        removed += len(dropped_ids)
+        logger.warning(
+            f"Merged duplicate comics {dropped_ids} into {kept['id']} ({kept['issue']} #{kept['issue_number']}, "
+            f"{kept['series_start_year']}){': ' + merged if merged else ''}."
+        )
+    db.session.commit()
+    if removed:
+        logger.warning(f"Removed {removed} duplicate comics before adding the unique index.")
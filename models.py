@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from database import db
 
 class Comic(db.Model):
@@ -21,16 +23,32 @@ class Comic(db.Model):
         story_order (int): The reading order of the issue within its storyline.
         status (str): Read/unread status of the comic. Defaults to "Unread".
         cover_image_url (str): URL of the issue's cover image, fetched from the Comic Vine API.
+        cover_path (str): Location of the downloaded cover, relative to the covers directory.
+        cover_thumb_path (str): Location of the grid thumbnail, relative to the covers directory.
+        cover_width (int): Width of the thumbnail in pixels.
+        cover_height (int): Height of the thumbnail in pixels.
+        cover_retry_at (datetime): After a failed cover download, when to try again (UTC).
+        row_hash (str): Hash of the CSV row the comic was last imported from; rows
+            with the same hash are skipped on re-import. Empty while Comic Vine
+            details are missing, so the next import retries them.
 
     Table:
         __tablename__ = 'comics'
 
+    Indexes:
+        - uq_comics_natural_key: Unique (issue, issue_number, series_start_year),
+          the natural key used by the CSV import and its ON CONFLICT upsert.
+        - ix_comics_storyline_order: (storyline, story_order, id), matching the
+          ORDER BY of the storyline view so it can be read in index order.
+
     Notes:
         - The `issue_title` and `cover_image_url` fields are populated using 
           the Comic Vine API if the information is missing during CSV import.
         - The `storyline` and `story_order` fields are optional but useful for 
           grouping and sequencing comics in a reading order.
         - The `status` field allows tracking of whether the comic has been read.
+        - The `cover_*` path and size fields are filled in by `covers.py` once the
+          cover has been downloaded and thumbnailed locally.
 
     Example:
         To create a new comic record:
@@ -50,6 +68,10 @@ class Comic(db.Model):
          db.session.commit()
     """
     __tablename__ = 'comics'
+    __table_args__ = (
+        db.Index('uq_comics_natural_key', 'issue', 'issue_number', 'series_start_year', unique=True),
+        db.Index('ix_comics_storyline_order', 'storyline', 'story_order', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     issue = db.Column(db.String(255), nullable=False) 
@@ -62,4 +84,153 @@ class Comic(db.Model):
     storyline = db.Column(db.String(255), nullable=True)
     story_order = db.Column(db.Integer, nullable=True)
     status = db.Column(db.String(255), default='Unread')
-    cover_image_url = db.Column(db.String(255), nullable=True)
\ No newline at end of file
+    cover_image_url = db.Column(db.String(255), nullable=True)
+    cover_path = db.Column(db.String(255), nullable=True)
+    cover_thumb_path = db.Column(db.String(255), nullable=True)
+    cover_width = db.Column(db.Integer, nullable=True)
+    cover_height = db.Column(db.Integer, nullable=True)
+    cover_retry_at = db.Column(db.DateTime, nullable=True)
+    row_hash = db.Column(db.String(40), nullable=True)
+
+
+class ImportCheckpoint(db.Model):
+    """
+    Progress of a streaming CSV import, used to resume an interrupted run.
+
+    A checkpoint is committed together with every imported chunk and deleted once
+    the whole file has been imported.
+
+    Attributes:
+        file_hash (str): SHA-256 of the CSV file; identifies the import.
+        filename (str): Name of the CSV file, for reference.
+        rows_done (int): Number of CSV data rows already committed.
+        updated_at (datetime): When the last chunk was committed.
+
+    Table:
+        __tablename__ = 'import_checkpoints'
+    """
+    __tablename__ = 'import_checkpoints'
+
+    file_hash = db.Column(db.String(64), primary_key=True)
+    filename = db.Column(db.String(255), nullable=True)
+    rows_done = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class DataVersion(db.Model):
+    """
+    Version of the collection's data, shared by every process using the database.
+
+    A single row, bumped by every write to the collection (web requests, the
+    command-line importer, background jobs). The web app compares it with the
+    version of its in-memory view cache on every request.
+
+    Attributes:
+        id (int): Primary key; always 1.
+        generation (str): Random id chosen when the row is created, so ETags of a
+            recreated database never match the old one's version numbers.
+        version (int): Incremented on every write to the collection.
+        updated_at (datetime): When the version last changed (UTC).
+
+    Table:
+        __tablename__ = 'data_version'
+    """
+    __tablename__ = 'data_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    generation = db.Column(db.String(32), nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ImportJob(db.Model):
+    """
+    A CSV import running in the background job queue.
+
+    The upload route creates a job and returns its id immediately; the worker
+    thread updates the progress counters after every committed chunk, and clients
+    poll `/jobs/<id>` for them.
+
+    Attributes:
+        id (int): Primary key, returned to the client as the job id.
+        filename (str): Name of the uploaded CSV file.
+        filepath (str): Location of the uploaded file on disk.
+        status (str): 'queued', 'running', 'completed' or 'failed'.
+        total_rows (int): Number of CSV data rows in the file, used for the ETA.
+        rows_parsed (int): CSV rows read so far.
+        rows_enriched (int): Comics that received Comic Vine details so far.
+        rows_written (int): Comics added or updated so far.
+        rows_unchanged (int): Rows skipped because the comic was already up to date.
+        rows_removed (int): Comics not in the file (deleted when `prune` is set).
+        prune (bool): Delete comics that are not in the file.
+        api_calls (int): HTTP requests sent to Comic Vine so far.
+        error (str): Error message when the job failed.
+        created_at (datetime): When the job was queued.
+        started_at (datetime): When a worker picked the job up.
+        finished_at (datetime): When the job completed or failed.
+
+    Table:
+        __tablename__ = 'import_jobs'
+    """
+    __tablename__ = 'import_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    filepath = db.Column(db.String(1024), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    total_rows = db.Column(db.Integer, nullable=True)
+    rows_parsed = db.Column(db.Integer, nullable=False, default=0)
+    rows_enriched = db.Column(db.Integer, nullable=False, default=0)
+    rows_written = db.Column(db.Integer, nullable=False, default=0)
+    rows_unchanged = db.Column(db.Integer, nullable=True, default=0)
+    rows_removed = db.Column(db.Integer, nullable=True, default=0)
+    prune = db.Column(db.Boolean, nullable=True, default=False)
+    api_calls = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+
+class PrefetchTask(db.Model):
+    """
+    A volume queued for background prefetching from Comic Vine.
+
+    The prefetch scheduler keeps one task per (series, start year) in the
+    collection. Running a task resolves the volume, fetches its issue list into
+    the response cache and fills in missing titles and covers for the volume's
+    comics. Tasks are run again once `next_run_at` passes, so the queue survives
+    restarts and cached issue lists are refreshed.
+
+    Attributes:
+        id (int): Primary key.
+        series (str): Name of the comic series, as stored on the comics.
+        series_start_year (int): Year the series started.
+        volume_id (int): Comic Vine volume id, once resolved.
+        missing (int): Comics of the volume still missing a title or cover; tasks
+            with more missing comics run first.
+        status (str): 'pending', 'done', 'not_found' or 'failed'.
+        attempts (int): Consecutive failed runs, used for the retry backoff.
+        last_error (str): Error message of the last failed run.
+        next_run_at (datetime): When the task is due (UTC).
+        updated_at (datetime): When the task last ran or changed.
+
+    Table:
+        __tablename__ = 'prefetch_tasks'
+    """
+    __tablename__ = 'prefetch_tasks'
+    __table_args__ = (
+        db.Index('uq_prefetch_tasks_series', 'series', 'series_start_year', unique=True),
+        db.Index('ix_prefetch_tasks_due', 'next_run_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    series = db.Column(db.String(255), nullable=False)
+    series_start_year = db.Column(db.Integer, nullable=False)
+    volume_id = db.Column(db.Integer, nullable=True)
+    missing = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
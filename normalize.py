@@ -0,0 +1,77 @@
+"""
+    Normalization of series titles and issue numbers for Comic Vine lookups.
+
+    CSV exports are noisy: "Action Comics " carries a trailing space, "017" a
+    leading zero, and half issues may be written "½" or "1/2". Comic Vine spells
+    the same things differently, so both sides of every comparison are reduced to
+    a canonical form first.
+
+    Examples:
+        >>> normalize_title("  The Amazing Spider-Man ")
+        'amazing spider man'
+        >>> normalize_issue_number("017")
+        '17'
+        >>> normalize_issue_number("½")
+        '1/2'
+"""
+
+import re
+import unicodedata
+
+# Vulgar fractions, spelled the way Comic Vine numbers half and quarter issues
+_FRACTIONS = {'½': '1/2', '¼': '1/4', '¾': '3/4', '⅓': '1/3', '⅔': '2/3'}
+
+_LEADING_ARTICLE = re.compile(r'^the ')
+_PUNCTUATION = re.compile(r'[^\w\s/]')
+_WHITESPACE = re.compile(r'\s+')
+_NUMBER = re.compile(r'^(-?)0*(\d+)(.*)$')
+
+
+def normalize_title(title):
+    """
+    Reduce a series title to a canonical form for matching.
+
+    Case, accents, punctuation, "&" versus "and", a leading article and runs of
+    whitespace are ignored.
+
+    Args:
+        title (str): The series title.
+
+    Returns:
+        str: The normalized title ('' for None).
+    """
+    if not title:
+        return ''
+    text = unicodedata.normalize('NFKD', str(title))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = text.casefold().replace('&', ' and ')
+    text = _PUNCTUATION.sub(' ', text)
+    text = _WHITESPACE.sub(' ', text).strip()
+    return _LEADING_ARTICLE.sub('', text)
+
+
+def normalize_issue_number(number):
+    """
+    Reduce an issue number to a canonical form for matching.
+
+    Surrounding whitespace, a leading "#", leading zeros and letter case are
+    ignored, and vulgar fractions are spelled out ("½" becomes "1/2", "1½"
+    becomes "1 1/2").
+
+    Args:
+        number (str): The issue number, e.g. "017", " 1 ", "#5", "½" or "1.5".
+
+    Returns:
+        str: The normalized issue number ('' for None).
+    """
+    if number is None:
+        return ''
+    text = str(number).strip().casefold().lstrip('#').strip()
+    for fraction, spelled in _FRACTIONS.items():
+        text = text.replace(fraction, f' {spelled}')
+    text = _WHITESPACE.sub(' ', text).strip()
+    match = _NUMBER.match(text)
+    if match:
+        sign, digits, rest = match.groups()
+        text = f'{sign}{int(digits)}{rest}'
+    return text
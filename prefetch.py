@@ -0,0 +1,285 @@
+"""
+    Background prefetching of Comic Vine data during idle time.
+
+    Imports only look up the rows in the uploaded file, and only while the upload
+    runs, so the API quota is used in bursts and most of the hourly allowance goes
+    unused. The prefetch scheduler spends that spare quota slowly in the
+    background:
+
+        - It keeps a persisted queue (`PrefetchTask`) with one task per volume
+          (series and start year) in the collection.
+        - Running a task resolves the volume and fetches its issue list into the
+          response cache, so later imports of that series need no API calls.
+        - It then fills in the titles and covers of the volume's comics that are
+          still missing them.
+        - Volumes with the most comics missing details run first. Finished tasks
+          run again a day later to refresh the cached issue list.
+
+    The scheduler has its own rate budget, a fraction of the hourly quota at a
+    slow, even pace. Every call also goes through the shared limiter in
+    `api_client`, so imports and prefetching together stay within Comic Vine's
+    limits. Nothing runs while an import job is queued or running. After an
+    HTTP 420 the scheduler sleeps until the hourly window resets.
+
+    Environment variables:
+        - COMIC_VINE_PREFETCH: Set to "off" to disable the scheduler.
+        - COMIC_VINE_PREFETCH_HOURLY_LIMIT: Requests per resource per hour the
+          scheduler may use (default 100, half of Comic Vine's limit).
+        - COMIC_VINE_PREFETCH_MAX_RPS: Requests per second (default 0.05, one
+          request every 20 seconds).
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, select
+
+from api_client import COMIC_VINE_API_KEY, ComicVineResolver, rate_limiter
+from database import db
+from import_data import MISSING_DETAILS, enrich_comics
+from metrics import PREFETCH_QUEUE, PREFETCH_TASKS
+from models import Comic, ImportJob, PrefetchTask
+from rate_limit import ComicVineRateLimiter, RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOURLY_LIMIT = 100
+DEFAULT_MAX_RPS = 0.05
+
+# Matches the 'issues' TTL of the response cache
+REFRESH_INTERVAL = timedelta(days=1)
+NOT_FOUND_RETRY = timedelta(days=7)
+MAX_RETRY_DELAY = timedelta(days=1)
+# How often an idle scheduler checks for new work and refreshes the queue
+POLL_SECONDS = 60
+
+
+def budget_from_env():
+    """
+    Create the scheduler's own rate budget from environment variables.
+
+    The budget never waits for hourly tokens (`max_wait=0`); a task that runs out
+    is retried on the next poll.
+
+    Returns:
+        ComicVineRateLimiter: The prefetch budget.
+    """
+    return ComicVineRateLimiter(
+        hourly_limit=int(os.getenv('COMIC_VINE_PREFETCH_HOURLY_LIMIT', DEFAULT_HOURLY_LIMIT)),
+        max_rps=float(os.getenv('COMIC_VINE_PREFETCH_MAX_RPS', DEFAULT_MAX_RPS)),
+        max_wait=0,
+    )
+
+
+def refresh_queue():
+    """
+    Sync the queue with the volumes in the collection.
+
+    Adds a task for every new volume, drops tasks for volumes no longer in the
+    collection and updates the count of comics missing details. A finished volume
+    that gained comics without details is due again right away.
+
+    Must be called inside an application context.
+
+    Returns:
+        int: The number of tasks due now.
+    """
+    comics = Comic.__table__
+    volumes = {
+        (series, start_year): int(missing or 0)
+        for series, start_year, missing in db.session.execute(
+            select(comics.c.issue, comics.c.series_start_year, func.sum(case((MISSING_DETAILS, 1), else_=0)))
+            .group_by(comics.c.issue, comics.c.series_start_year)
+        )
+    }
+
+    now = datetime.utcnow()
+    tasks = {(task.series, task.series_start_year): task for task in PrefetchTask.query.all()}
+    for key, missing in volumes.items():
+        task = tasks.pop(key, None)
+        if task is None:
+            db.session.add(PrefetchTask(series=key[0], series_start_year=key[1], missing=missing, next_run_at=now))
+        elif task.missing != missing:
+            if missing > task.missing and task.status == 'done':
+                task.next_run_at = now
+            task.missing = missing
+    for task in tasks.values():
+        db.session.delete(task)
+    db.session.commit()
+
+    due = PrefetchTask.query.filter(PrefetchTask.next_run_at <= now).count()
+    PREFETCH_QUEUE.set(due)
+    return due
+
+
+def next_task():
+    """
+    Pick the task to run next.
+
+    Returns:
+        PrefetchTask: The due task with the most comics missing details, or None.
+    """
+    return (
+        PrefetchTask.query
+        .filter(PrefetchTask.next_run_at <= datetime.utcnow())
+        .order_by(PrefetchTask.missing.desc(), PrefetchTask.next_run_at, PrefetchTask.id)
+        .first()
+    )
+
+
+def run_task(task, budget):
+    """
+    Prefetch one volume and backfill its comics, then reschedule the task.
+
+    Args:
+        task (PrefetchTask): The task to run.
+        budget (ComicVineRateLimiter): The scheduler's rate budget.
+
+    Returns:
+        str: The outcome: 'done', 'not_found', 'failed' or 'rate_limited' (the
+             task stays due and is retried later).
+    """
+    now = datetime.utcnow()
+    resolver = ComicVineResolver(budget=budget)
+    refusals = budget.refusals + rate_limiter.refusals
+    try:
+        volume_id = resolver.resolve_volume(task.series, task.series_start_year)
+        if volume_id is None:
+            # The resolver only memoizes searches that found no volume; a failed
+            # request leaves nothing behind
+            outcome = 'not_found' if resolver.volume_ids else 'failed'
+        elif resolver.issue_index(volume_id) is None:
+            outcome = 'failed'
+        else:
+            task.volume_id = volume_id
+            if task.missing:
+                summary = enrich_comics(max_workers=1, series=(task.series, task.series_start_year),
+                                        resolver=resolver)
+                task.missing -= summary['enriched']
+            # Enrichment stops quietly when the budget, the hourly quota or an
+            # HTTP 420 cuts it short mid-volume
+            limited = budget.refusals + rate_limiter.refusals > refusals
+            outcome = 'rate_limited' if limited or rate_limiter.blocked else 'done'
+    except RateLimitExceeded:
+        outcome = 'rate_limited'
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Prefetching {task.series} ({task.series_start_year}) failed: {e}")
+        task.last_error = str(e)
+        outcome = 'failed'
+
+    if outcome == 'done':
+        task.status = 'done'
+        task.attempts = 0
+        task.last_error = None
+        task.next_run_at = now + REFRESH_INTERVAL
+    elif outcome == 'not_found':
+        task.status = 'not_found'
+        task.attempts = 0
+        task.next_run_at = now + NOT_FOUND_RETRY
+    elif outcome == 'failed':
+        task.status = 'failed'
+        task.attempts += 1
+        task.next_run_at = now + min(timedelta(minutes=2 ** task.attempts), MAX_RETRY_DELAY)
+    db.session.commit()
+
+    PREFETCH_TASKS.inc(result=outcome)
+    logger.debug(f"Prefetch of {task.series} ({task.series_start_year}): {outcome}.")
+    return outcome
+
+
+class PrefetchScheduler:
+    """
+    Background thread that works through the prefetch queue when the app is idle.
+
+    Attributes:
+        app (Flask): The application, used to push an app context.
+        budget (ComicVineRateLimiter): The scheduler's own rate budget.
+        poll_seconds (float): Sleep between checks when there is nothing to do.
+    """
+
+    def __init__(self, app, budget=None, poll_seconds=POLL_SECONDS):
+        self.app = app
+        self.budget = budget or budget_from_env()
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread = None
+        self._refreshed_at = None
+
+    def start(self):
+        """Start the scheduler thread."""
+        self._thread = threading.Thread(target=self._run, name='prefetch', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Ask the scheduler thread to stop and wait for it.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the current task.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self):
+        """
+        Run the next due task, if the app is idle.
+
+        Returns:
+            str: The task outcome (see `run_task`), or None if nothing ran
+                 because no task was due, an import is in progress or calls are
+                 suspended after an HTTP 420.
+        """
+        if rate_limiter.blocked:
+            return None
+        with self.app.app_context():
+            try:
+                if ImportJob.query.filter(ImportJob.status.in_(['queued', 'running'])).first():
+                    return None
+                if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.poll_seconds:
+                    refresh_queue()
+                    self._refreshed_at = time.monotonic()
+                task = next_task()
+                return run_task(task, self.budget) if task else None
+            finally:
+                db.session.remove()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if rate_limiter.blocked:
+                # Paused until the hourly window that answered HTTP 420 resets
+                logger.info(f"Prefetching paused for {rate_limiter.blocked_for:.0f}s after HTTP 420.")
+                self._stop.wait(rate_limiter.blocked_for)
+                continue
+            try:
+                outcome = self.run_once()
+            except Exception as e:
+                logger.error(f"Prefetch scheduler error: {e}")
+                outcome = None
+            if outcome in (None, 'rate_limited'):
+                self._stop.wait(self.poll_seconds)
+
+
+def start_prefetcher(app):
+    """
+    Start the prefetch scheduler unless it is disabled or no API key is set.
+
+    Args:
+        app (Flask): The application.
+
+    Returns:
+        PrefetchScheduler: The running scheduler, or None.
+    """
+    if os.getenv('COMIC_VINE_PREFETCH', 'on').lower() in ('off', '0', 'false'):
+        return None
+    if not COMIC_VINE_API_KEY:
+        logger.info("No Comic Vine API key set; prefetching is disabled.")
+        return None
+    scheduler = PrefetchScheduler(app)
+    scheduler.start()
+    logger.info("Started the Comic Vine prefetch scheduler.")
+    return scheduler
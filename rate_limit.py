@@ -0,0 +1,227 @@
+"""
+    Client-side rate limiting for the Comic Vine API.
+
+    Comic Vine allows a fixed number of requests per resource per hour (200 at the
+    time of writing) and additionally throttles clients that send requests too
+    quickly ("velocity" limiting). Exceeding either limit results in HTTP 420.
+
+    `ComicVineRateLimiter` models the hourly limit with a sliding-window log per
+    resource (the send times of the last hour), so no rolling hour ever sees more
+    than the limit, and the velocity limit with one shared token bucket. It is
+    safe to share across threads.
+
+    Environment variables:
+        - COMIC_VINE_HOURLY_LIMIT: Requests allowed per resource per hour.
+        - COMIC_VINE_MAX_RPS: Maximum requests per second across all resources.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+DEFAULT_HOURLY_LIMIT = 200
+DEFAULT_MAX_RPS = 1.0
+HOUR = 3600
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the Comic Vine rate limit has been (or would be) exceeded."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Attributes:
+        capacity (float): Maximum number of tokens held at once (burst size).
+        rate (float): Tokens added per second.
+    """
+
+    def __init__(self, capacity, rate):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """
+        Take a token, going into debt if none is available.
+
+        Returns:
+            float: Seconds the caller must wait before using the token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def wait_time(self):
+        """
+        Seconds until a token would be available, without taking one.
+
+        Returns:
+            float: 0.0 if a token is available now.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class SlidingWindowLog:
+    """
+    Thread-safe log of send times that allows `limit` sends per rolling window.
+
+    A refilling token bucket that starts full lets through its capacity plus a
+    window's worth of refill within one window; the log never does.
+
+    Attributes:
+        limit (int): Sends allowed within any `window` seconds.
+        window (float): Length of the rolling window in seconds.
+    """
+
+    def __init__(self, limit, window=HOUR):
+        self.limit = int(limit)
+        self.window = float(window)
+        self._sent = deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        while self._sent and self._sent[0] <= now - self.window:
+            self._sent.popleft()
+
+    def reserve(self, not_before=0.0):
+        """
+        Record a send at the earliest time the window allows.
+
+        Args:
+            not_before (float): Seconds from now before which the caller will not
+                send anyway (e.g. a velocity delay), so the log holds the real
+                send time.
+
+        Returns:
+            float: Seconds the caller must wait before sending.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            send_at = now + not_before
+            if len(self._sent) >= self.limit:
+                # The send `limit` places back must leave the window first
+                send_at = max(send_at, self._sent[-self.limit] + self.window)
+            self._sent.append(send_at)
+            return send_at - now
+
+    def wait_time(self):
+        """
+        Seconds until a send would be allowed, without recording one.
+
+        Returns:
+            float: 0.0 if a send is allowed now.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if len(self._sent) < self.limit:
+                return 0.0
+            return max(0.0, self._sent[-self.limit] + self.window - now)
+
+
+class ComicVineRateLimiter:
+    """
+    Enforce Comic Vine's per-resource hourly limits and velocity limit.
+
+    Attributes:
+        hourly_limit (int): Requests allowed per resource per hour.
+        max_rps (float): Maximum requests per second across all resources.
+        max_wait (float): Longest time `acquire` will block for an hourly token
+            before giving up with `RateLimitExceeded`.
+        refusals (int): Number of `acquire` calls refused so far. Callers whose
+            errors are swallowed further down can compare it before and after.
+    """
+
+    def __init__(self, hourly_limit=DEFAULT_HOURLY_LIMIT, max_rps=DEFAULT_MAX_RPS, max_wait=30.0):
+        self.hourly_limit = hourly_limit
+        self.max_rps = max_rps
+        self.max_wait = max_wait
+        self._velocity = TokenBucket(1, max_rps)
+        self._hourly = {}
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.refusals = 0
+
+    def _bucket(self, resource):
+        with self._lock:
+            if resource not in self._hourly:
+                self._hourly[resource] = SlidingWindowLog(self.hourly_limit, HOUR)
+            return self._hourly[resource]
+
+    @property
+    def blocked(self):
+        """bool: True while calls are suspended after an HTTP 420."""
+        return time.monotonic() < self._blocked_until
+
+    @property
+    def blocked_for(self):
+        """float: Seconds until calls resume after an HTTP 420 (0.0 if not blocked)."""
+        return max(0.0, self._blocked_until - time.monotonic())
+
+    def block(self, seconds=HOUR):
+        """
+        Suspend all calls, typically after the API answered with HTTP 420.
+
+        Args:
+            seconds (float): How long to suspend calls for.
+        """
+        self._blocked_until = time.monotonic() + seconds
+
+    def _refuse(self):
+        with self._lock:
+            self.refusals += 1
+
+    def acquire(self, resource):
+        """
+        Wait until a request to `resource` may be sent.
+
+        Args:
+            resource (str): The Comic Vine resource name (e.g. 'issues').
+
+        Raises:
+            RateLimitExceeded: If calls are suspended, or the hourly quota for the
+                resource would not free up within `max_wait` seconds.
+        """
+        if self.blocked:
+            self._refuse()
+            raise RateLimitExceeded("Comic Vine API rate limit reached.")
+
+        bucket = self._bucket(resource)
+        wait = bucket.wait_time()
+        if wait > self.max_wait:
+            self._refuse()
+            raise RateLimitExceeded(f"Hourly Comic Vine quota for '{resource}' exhausted.")
+        delay = bucket.reserve(not_before=self._velocity.reserve())
+        if delay > 0:
+            time.sleep(delay)
+
+
+def rate_limiter_from_env():
+    """
+    Create a rate limiter from environment variables.
+
+    Returns:
+        ComicVineRateLimiter: The configured limiter.
+    """
+    return ComicVineRateLimiter(
+        hourly_limit=int(os.getenv('COMIC_VINE_HOURLY_LIMIT', DEFAULT_HOURLY_LIMIT)),
+        max_rps=float(os.getenv('COMIC_VINE_MAX_RPS', DEFAULT_MAX_RPS)),
+    )
@@ -0,0 +1,197 @@
+"""
+    Full-text search over comics, backed by an SQLite FTS5 index.
+
+    `comics_fts` is an external-content FTS5 table: it stores only the inverted
+    index and reads the text from `comics`. Triggers on `comics` keep it in sync
+    with every INSERT, UPDATE and DELETE, so imports, status changes and pruning
+    need no extra code. Matches are ranked with bm25, weighting the series name
+    above the issue title, storyline, TBP and availability. Queries matching more
+    than `MAX_RANKED` comics rank only the first `MAX_RANKED` of them, which keeps
+    one- and two-letter prefixes as fast as specific searches.
+
+    On databases without FTS5 (or other than SQLite) searches fall back to a
+    LIKE scan, which is correct but does not scale.
+"""
+
+import logging
+import re
+
+from sqlalchemy import and_, case, inspect, or_, select, text
+from sqlalchemy.exc import OperationalError
+
+from database import db
+from models import Comic
+from utils import CARD_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'comics_fts'
+
+# Searched columns and their bm25 weights
+SEARCH_COLUMNS = ('issue', 'issue_title', 'storyline', 'tbp', 'availability')
+COLUMN_WEIGHTS = (10.0, 5.0, 3.0, 1.0, 0.5)
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Matches ranked per search. bm25 is computed for every candidate, so a broad
+# query ('sp', or an availability shared by a fifth of the collection) only ranks
+# the first matches in id order; narrower queries rank all of theirs.
+MAX_RANKED = 2000
+
+# Largest SQLite rowid, for searches with fewer than MAX_RANKED matches
+_MAX_ROWID = 2 ** 63 - 1
+
+# FTS5's unicode61 tokenizer splits on anything that is not a letter or digit
+_TOKEN = re.compile(r'[^\W_]+')
+
+_COLUMN_LIST = ', '.join(SEARCH_COLUMNS)
+_NEW_VALUES = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+_OLD_VALUES = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+
+SCHEMA = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({_COLUMN_LIST}, content='comics', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON comics BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_COLUMN_LIST}) VALUES (new.id, {_NEW_VALUES}); END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON comics BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMN_LIST}) VALUES ('delete', old.id, {_OLD_VALUES}); END",
+    # Status changes do not touch searched columns and leave the index alone
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF {_COLUMN_LIST} ON comics BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMN_LIST}) VALUES ('delete', old.id, {_OLD_VALUES}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_COLUMN_LIST}) VALUES (new.id, {_NEW_VALUES}); END",
+]
+
+_fts_available = None
+
+
+def create_search_index():
+    """
+    Create the FTS5 table and its triggers if they are missing, and index the
+    existing comics.
+
+    Must be called inside an application context. Does nothing on databases other
+    than SQLite, or when SQLite was built without FTS5.
+
+    Returns:
+        bool: True if the search index is available.
+    """
+    global _fts_available
+    if db.engine.dialect.name != 'sqlite':
+        _fts_available = False
+        return False
+    if inspect(db.engine).has_table(FTS_TABLE):
+        _fts_available = True
+        return True
+
+    try:
+        for statement in SCHEMA:
+            db.session.execute(text(statement))
+        db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        db.session.commit()
+    except OperationalError as e:
+        db.session.rollback()
+        logger.warning(f"Full-text search is unavailable, falling back to LIKE: {e}")
+        _fts_available = False
+        return False
+
+    logger.info(f"Created search index {FTS_TABLE}.")
+    _fts_available = True
+    return True
+
+
+def search_available():
+    """
+    Check whether the FTS5 index exists in the current database.
+
+    Returns:
+        bool: True if searches use the index.
+    """
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = db.engine.dialect.name == 'sqlite' and inspect(db.engine).has_table(FTS_TABLE)
+    return _fts_available
+
+
+def build_match_query(query):
+    """
+    Turn user input into an FTS5 MATCH expression with prefix matching.
+
+    Every word must match the start of a word in one of the searched columns;
+    FTS5 syntax characters in the input are treated as plain text.
+
+    Args:
+        query (str): The search text, e.g. "spider man".
+
+    Returns:
+        str: The MATCH expression (e.g. '"spider"* "man"*'), or None if the query
+             has no searchable words.
+
+    Example:
+        >>> build_match_query('Spider-Man: Blue')
+        '"spider"* "man"* "blue"*'
+    """
+    tokens = _TOKEN.findall((query or '').lower())
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_comics(query, limit=DEFAULT_LIMIT, status=None):
+    """
+    Search comics by series, issue title, storyline, TBP and availability.
+
+    Args:
+        query (str): The search text; words are matched as prefixes.
+        limit (int): Maximum number of results.
+        status (str, optional): Only return comics with this status.
+
+    Returns:
+        list: Rows with the `CARD_COLUMNS` attributes and a `score` (higher is
+              more relevant), best match first. When more than `MAX_RANKED`
+              comics match, these are the best of the first `MAX_RANKED` matches
+              by id rather than of the whole collection.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+    limit = max(1, min(int(limit), MAX_LIMIT))
+
+    if not search_available():
+        return _search_like(query, limit, status)
+
+    weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+    columns = ', '.join(f'comics.{column.name}' for column in CARD_COLUMNS)
+    status_join = f'JOIN comics ON comics.id = {FTS_TABLE}.rowid AND comics.status = :status' if status else ''
+    # Rowid of the first match past MAX_RANKED, found from the doclists without
+    # scoring anything; NULL when the query matches fewer comics
+    last_ranked = (
+        f"SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} {status_join} WHERE {FTS_TABLE} MATCH :match "
+        f"ORDER BY {FTS_TABLE}.rowid LIMIT 1 OFFSET :max_ranked"
+    )
+    # Rank the candidates from the index alone, then load only the rows that made the cut
+    statement = text(
+        f"SELECT {columns}, -hits.rank AS score FROM ("
+        f"SELECT {FTS_TABLE}.rowid AS rowid, bm25({FTS_TABLE}, {weights}) AS rank FROM {FTS_TABLE} {status_join} "
+        f"WHERE {FTS_TABLE} MATCH :match AND {FTS_TABLE}.rowid < coalesce(({last_ranked}), :max_rowid) "
+        f"ORDER BY rank, rowid LIMIT :limit"
+        f") AS hits JOIN comics ON comics.id = hits.rowid "
+        f"ORDER BY hits.rank, hits.rowid"
+    )
+    params = {'match': match, 'limit': limit, 'status': status, 'max_ranked': MAX_RANKED, 'max_rowid': _MAX_ROWID}
+    return db.session.execute(statement, params).all()
+
+
+def _search_like(query, limit, status):
+    """Fallback search with one LIKE per word and column, ranked by series matches."""
+    columns = [getattr(Comic, column) for column in SEARCH_COLUMNS]
+    conditions = []
+    for token in _TOKEN.findall(query.lower()):
+        pattern = f'%{token}%'
+        conditions.append(or_(*(column.ilike(pattern) for column in columns)))
+    score = case((Comic.issue.ilike(f'{query.strip()}%'), 1.0), else_=0.0).label('score')
+    statement = select(*CARD_COLUMNS, score).where(and_(*conditions))
+    if status:
+        statement = statement.where(Comic.status == status)
+    statement = statement.order_by(score.desc(), Comic.issue, Comic.id).limit(limit)
+    return db.session.execute(statement).all()
@@ -0,0 +1,57 @@
+"""
+    Collection statistics, cached until the next write.
+
+    The home page needs to know whether any comics exist, and shows how many
+    comics, read comics and storylines the collection holds. These only change
+    when an import commits or a status changes, and every such write bumps the
+    data version (see `view_cache`), so the values are computed at most once per
+    version and then served from memory.
+"""
+
+from sqlalchemy import case, func, select
+
+from database import db
+from models import Comic
+from view_cache import view_cache
+
+
+def has_comics():
+    """
+    Check whether the collection contains at least one comic.
+
+    Uses an EXISTS probe, which stops at the first row instead of counting the
+    whole table.
+
+    Returns:
+        bool: True if there is at least one comic.
+    """
+    return view_cache.get_or_set(('stats', 'has_comics'), _probe_comics)
+
+
+def get_collection_stats():
+    """
+    Summarize the collection with a single aggregate query.
+
+    Returns:
+        dict: 'total' comics, 'read' comics, 'unread' comics and the number of
+              'storylines' (comics without a storyline are not counted as one).
+    """
+    return view_cache.get_or_set(('stats', 'collection'), _compute_stats)
+
+
+def _probe_comics():
+    return db.session.execute(select(select(Comic.id).exists())).scalar()
+
+
+def _compute_stats():
+    row = db.session.execute(select(
+        func.count(Comic.id).label('total'),
+        func.coalesce(func.sum(case((Comic.status == 'Read', 1), else_=0)), 0).label('read'),
+        func.count(func.distinct(Comic.storyline)).label('storylines'),
+    )).one()
+    return {
+        'total': row.total,
+        'read': row.read,
+        'unread': row.total - row.read,
+        'storylines': row.storylines,
+    }
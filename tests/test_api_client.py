@@ -0,0 +1,114 @@
+"""
+    Tests for the Comic Vine resolver against the local fake API.
+
+    Each test gets a fresh response cache, volume index and rate limiter, so every
+    request the resolver makes reaches the fake server and is counted there.
+
+        python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import api_client
+from api_cache import ApiCache
+from api_client import ISSUE_LIST_FIELDS, SEARCH_FIELDS, ComicVineResolver
+from fake_comicvine import FakeComicVine
+from rate_limit import ComicVineRateLimiter, RateLimitExceeded
+from volume_index import VolumeIndex, rank_volumes
+
+# Compressed bytes allowed for the first issue of a volume: one page of volume
+# search results and one page of issue summaries (about 1.9 KB against the fake)
+MAX_FIRST_ISSUE_BYTES = 3000
+
+
+@pytest.fixture
+def fake(tmp_path, monkeypatch):
+    """Point `api_client` at a fake Comic Vine with empty caches."""
+    with FakeComicVine() as server:
+        monkeypatch.setattr(api_client, 'COMIC_VINE_BASE_URL', server.base_url)
+        monkeypatch.setattr(api_client, 'api_cache', ApiCache(str(tmp_path / 'cache.db')))
+        monkeypatch.setattr(api_client, 'volume_index', VolumeIndex(str(tmp_path / 'cache.db')))
+        monkeypatch.setattr(api_client, 'rate_limiter', ComicVineRateLimiter(hourly_limit=1000, max_rps=1000))
+        yield server
+
+
+def test_first_issue_of_a_volume_searches_and_lists_issues(fake):
+    details = ComicVineResolver().get_issue_details('Superman', 1987, '1')
+
+    assert details['name']
+    assert fake.calls == {'search': 1, 'issues': 1}
+
+
+def test_next_issue_of_the_same_volume_needs_no_calls(fake):
+    resolver = ComicVineResolver()
+    resolver.get_issue_details('Superman', 1987, '1')
+    calls = dict(fake.calls)
+
+    details = resolver.get_issue_details('Superman', 1987, '2')
+
+    assert details['name']
+    assert fake.calls == calls
+
+
+def test_issue_details_come_from_the_issue_list(fake):
+    resolver = ComicVineResolver()
+    for issue_number in ('1', '2', '3'):
+        resolver.get_issue_details('Superman', 1987, issue_number)
+
+    # The per-issue endpoint (/issue/4000-<id>/) is never requested
+    assert 'issue' not in fake.calls
+
+
+def test_requests_ask_only_for_the_fields_used(fake):
+    ComicVineResolver().get_issue_details('Superman', 1987, '1')
+
+    field_lists = {endpoint: query.get('field_list') for endpoint, query in fake.requests}
+    assert field_lists == {'search': SEARCH_FIELDS, 'issues': ISSUE_LIST_FIELDS}
+
+
+def test_bytes_fetched_per_issue(fake):
+    stats = api_client.http_client.stats
+    resolver = ComicVineResolver()
+
+    before = stats.snapshot()['bytes']
+    resolver.get_issue_details('Superman', 1987, '1')
+    first_issue = stats.snapshot()['bytes'] - before
+
+    before = stats.snapshot()['bytes']
+    resolver.get_issue_details('Superman', 1987, '2')
+    next_issue = stats.snapshot()['bytes'] - before
+
+    assert 0 < first_issue <= MAX_FIRST_ISSUE_BYTES
+    assert next_issue == 0
+
+
+def test_every_retry_takes_a_rate_limiter_token(fake, monkeypatch):
+    fake.error_rate = 1.0
+    limiter = ComicVineRateLimiter(hourly_limit=2, max_rps=1000, max_wait=0)
+    monkeypatch.setattr(api_client, 'rate_limiter', limiter)
+    monkeypatch.setattr(api_client.http_client, 'backoff_base', 0.0)
+
+    # The HTTP client would retry three times; the limiter only allows two requests
+    with pytest.raises(RateLimitExceeded):
+        api_client.make_api_call(f'{fake.base_url}/search/', {'query': 'Superman', 'resources': 'volume'})
+
+    assert fake.calls == {'search': 2}
+    assert limiter.refusals == 1
+
+
+def test_volumes_from_another_year_are_never_matched():
+    volumes = [
+        {'id': 1, 'name': 'Superman', 'start_year': '1986'},
+        {'id': 2, 'name': 'Superman', 'start_year': '1988'},
+        {'id': 3, 'name': 'The Superman', 'start_year': '1987'},
+    ]
+
+    assert [volume['id'] for _, volume in rank_volumes('Superman', 1987, volumes)] == [3]
+    assert rank_volumes('Superman', 1987, volumes[:2]) == []
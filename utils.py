@@ -1,43 +1,156 @@
+from sqlalchemy import and_, case, func, or_, select, update
+
+from database import db
 from models import Comic
-from collections import defaultdict
 
-def get_comics_by_sorting(sort_option):
+# Statuses a comic can be set to
+STATUSES = ('Read', 'Unread')
+
+# Number of comic cards rendered per page or per storyline fragment
+PAGE_SIZE = 60
+
+# Columns needed to render a comic card; fetched as plain rows, not ORM objects
+CARD_COLUMNS = (
+    Comic.id,
+    Comic.issue,
+    Comic.issue_number,
+    Comic.issue_title,
+    Comic.issue_published_year,
+    Comic.tbp,
+    Comic.availability,
+    Comic.storyline,
+    Comic.story_order,
+    Comic.status,
+    Comic.cover_image_url,
+    Comic.cover_thumb_path,
+    Comic.cover_width,
+    Comic.cover_height,
+)
+
+
+def get_storyline_index():
     """
-    Retrieve comics sorted or grouped based on the provided sorting option.
+    Summarize every storyline with a single aggregate query.
 
-    Args:
-        sort_option (str): The sorting option to apply. Supported values:
-            - 'id': Sort comics by their ID in ascending order.
-            - Any other value (default): Group comics by storyline and sort by 
-              story order, then by ID within each group.
+    The ordering key (lowest comic id, i.e. roughly import order), the number of
+    comics and the number of read comics are all computed by the database, so no
+    comics are loaded into Python to build the index.
 
     Returns:
-        dict: A dictionary where the keys are storyline names (or 'All Comics' 
-              for 'id' sorting) and the values are lists of `Comic` objects.
+        list: Rows with `storyline`, `total` (number of comics), `read` (number of
+              comics with status "Read") and `first_id`.
 
     Example:
-        >>> get_comics_by_sorting('id')
-        {'All Comics': [Comic(id=1, ...), Comic(id=2, ...)]}
+        >>> get_storyline_index()
+        [('Superman Origins', 12, 3, 1), ('Legion of Superheroes Origins', 8, 0, 13)]
+    """
+    first_id = func.min(Comic.id).label('first_id')
+    query = select(
+        Comic.storyline.label('storyline'),
+        func.count(Comic.id).label('total'),
+        func.sum(case((Comic.status == 'Read', 1), else_=0)).label('read'),
+        first_id,
+    ).group_by(Comic.storyline).order_by(first_id)
+    return db.session.execute(query).all()
+
 
-        >>> get_comics_by_sorting('storyline')
-        {
-            'Storyline A': [Comic(id=1, ...), Comic(id=3, ...)],
-            'Storyline B': [Comic(id=2, ...)]
-        }
+def get_comics_page(sort_option, storyline=None, after=None, limit=PAGE_SIZE, status=None, columns=CARD_COLUMNS):
+    """
+    Retrieve one page of comics using keyset pagination.
+
+    Args:
+        sort_option (str): 'id' to page through all comics by ID; any other value
+            pages through a single storyline by story order, then ID.
+        storyline (str): The storyline to page through when not sorting by ID.
+            None selects comics without a storyline.
+        after (str): Cursor returned with the previous page, or None for the
+            first page.
+        limit (int): Maximum number of comics to return.
+        status (str, optional): Only return comics with this status.
+        columns (tuple): Columns to select. The id and story order are always
+            selected, as the cursor is built from them.
+
+    Returns:
+        tuple: (comics, next_cursor) where `comics` is a list of rows with the
+               `columns` attributes and `next_cursor` is None on the last page.
 
     Raises:
-        None: This function does not raise exceptions but assumes the database 
-        and the `Comic` model are properly configured.
+        ValueError: If `after` is not a valid cursor.
     """
+    selected = {column.key for column in columns}
+    query = select(*columns, *(column for column in (Comic.id, Comic.story_order) if column.key not in selected))
+    if status is not None:
+        query = query.where(Comic.status == status)
     if sort_option == 'id':
-        comics = Comic.query.order_by(Comic.id).all()
-        return {'All Comics': comics}
+        query = query.order_by(Comic.id)
+        if after:
+            query = query.where(Comic.id > int(after))
     else:
-        comics = Comic.query.order_by(Comic.storyline, Comic.story_order, Comic.id).all()
-        comics_by_storyline = defaultdict(list)
-        storyline_order = {}
-        for comic in comics:
-            comics_by_storyline[comic.storyline].append(comic)
-            if comic.storyline not in storyline_order or comic.id < storyline_order[comic.storyline]:
-                storyline_order[comic.storyline] = comic.id
-        return dict(sorted(comics_by_storyline.items(), key=lambda x: storyline_order[x[0]]))
\ No newline at end of file
+        # Plain columns in index order, so ix_comics_storyline_order serves both
+        # the filter and the sort; comics without a story order come first
+        query = query.where(Comic.storyline.is_(None) if storyline is None else Comic.storyline == storyline)
+        query = query.order_by(Comic.story_order.asc().nulls_first(), Comic.id)
+        if after:
+            after_order, after_id = after.split(':')
+            after_id = int(after_id)
+            if after_order == '':
+                query = query.where(or_(
+                    Comic.story_order.isnot(None),
+                    and_(Comic.story_order.is_(None), Comic.id > after_id),
+                ))
+            else:
+                after_order = int(after_order)
+                query = query.where(or_(
+                    Comic.story_order > after_order,
+                    and_(Comic.story_order == after_order, Comic.id > after_id),
+                ))
+
+    # Fetch one extra row to learn whether another page follows
+    comics = db.session.execute(query.limit(limit + 1)).all()
+    if len(comics) <= limit:
+        return comics, None
+
+    comics = comics[:limit]
+    last = comics[-1]
+    if sort_option == 'id':
+        next_cursor = str(last.id)
+    else:
+        next_cursor = f"{'' if last.story_order is None else last.story_order}:{last.id}"
+    return comics, next_cursor
+
+
+def set_comics_status(status, ids=None, storyline=None):
+    """
+    Set the status of many comics with a single UPDATE statement.
+
+    Comics that already have the requested status are left untouched, so the
+    returned count only includes rows that actually changed. The caller commits.
+
+    Args:
+        status (str): The new status, one of `STATUSES`.
+        ids (list): IDs of the comics to update. When None, every comic in
+            `storyline` is updated instead.
+        storyline (str): The storyline to update when `ids` is None. None selects
+            comics without a storyline.
+
+    Returns:
+        int: The number of comics whose status changed.
+
+    Raises:
+        ValueError: If `status` is not a valid status.
+    """
+    if status not in STATUSES:
+        raise ValueError(f"Invalid status: {status!r}")
+
+    if ids is not None:
+        condition = Comic.id.in_(ids)
+    else:
+        condition = Comic.storyline.is_(None) if storyline is None else Comic.storyline == storyline
+    statement = (
+        update(Comic)
+        .where(condition, Comic.status.is_distinct_from(status))
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(statement).rowcount
+
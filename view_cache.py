@@ -0,0 +1,164 @@
+"""
+    Versioned in-memory cache for rendered comic views.
+
+    The collection only changes when an import commits or a comic's status is
+    toggled, so the pages built from it can be reused until then. Every write path
+    calls `bump_data_version()` in the same transaction, which increments the
+    data version so that all cached entries are dropped; views cache their results with `view_cache.get_or_set` and use
+    `view_cache.etag()` / `view_cache.last_modified` for conditional GETs.
+
+    The version is stored in the database (`DataVersion`), so writes made by
+    another process, such as the command-line importer, bump it too. The web app
+    calls `sync_data_version()` at the start of every request, which costs one
+    primary-key lookup and drops the cached views once the stored version moved.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+
+from database import db
+from models import DataVersion
+
+DEFAULT_MAX_ENTRIES = 512
+
+# Primary key of the single DataVersion row
+DATA_VERSION_ID = 1
+
+
+class VersionedCache:
+    """
+    Thread-safe cache whose entries are valid for a single data version.
+
+    Attributes:
+        version (int): Incremented on every write to the collection.
+        last_modified (datetime): When the version last changed (UTC, whole seconds).
+        instance_id (str): Identifies the version sequence: the database's
+            `DataVersion.generation` once synced, a random id before that, so
+            ETags from another database or process never match by accident.
+        max_entries (int): Maximum number of cached views per version. Beyond it
+            the least recently used view is evicted, so a flood of one-off keys
+            (search queries, API cursors) cannot crowd out the common pages.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.instance_id = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def etag(self):
+        """
+        Build the entity tag for the current data version.
+
+        Returns:
+            str: The ETag value (without quotes).
+        """
+        return f"{self.instance_id}-{self.version}"
+
+    def bump(self):
+        """Start a new data version and drop every cached entry."""
+        with self._lock:
+            self.version += 1
+            self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+            self._entries.clear()
+
+    def sync(self, instance_id, version, last_modified):
+        """
+        Adopt a data version read from the database.
+
+        Cached entries are dropped only if the version actually changed.
+
+        Args:
+            instance_id (str): The version sequence, see `instance_id`.
+            version (int): The current data version.
+            last_modified (datetime): When it last changed (UTC).
+        """
+        with self._lock:
+            if (instance_id, version) == (self.instance_id, self.version):
+                return
+            self.instance_id = instance_id
+            self.version = version
+            self.last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+            self._entries.clear()
+
+    def get_or_set(self, key, compute):
+        """
+        Return the cached value for `key`, computing and storing it on a miss.
+
+        Args:
+            key (hashable): Identifies the view (e.g. route and query arguments).
+            compute (callable): Builds the value; called without the lock held.
+
+        Returns:
+            The cached or freshly computed value.
+        """
+        with self._lock:
+            version = self.version
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        value = compute()
+
+        with self._lock:
+            # Values computed while a write landed may already be stale; skip them.
+            if self.version == version:
+                self._entries[key] = value
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+
+view_cache = VersionedCache()
+
+
+def create_data_version():
+    """
+    Create the shared data version row if the database does not have one yet.
+
+    Must be called inside an application context, after `db.create_all()`.
+    """
+    if db.session.get(DataVersion, DATA_VERSION_ID) is None:
+        db.session.add(DataVersion(id=DATA_VERSION_ID, generation=uuid.uuid4().hex[:8], version=0,
+                                   updated_at=datetime.utcnow()))
+        db.session.commit()
+
+
+def sync_data_version():
+    """
+    Bring `view_cache` up to the data version stored in the database.
+
+    Must be called inside an application context. Without a version row (a
+    database that was never upgraded) the in-process version is kept.
+    """
+    row = db.session.execute(
+        select(DataVersion.generation, DataVersion.version, DataVersion.updated_at)
+        .where(DataVersion.id == DATA_VERSION_ID)
+    ).first()
+    if row is not None:
+        view_cache.sync(*row)
+
+
+def bump_data_version():
+    """
+    Record that the collection changed, invalidating every cached view.
+
+    Must be called inside an application context, in the transaction that makes
+    the write, before it is committed: the new version is committed (or rolled
+    back) together with the change, and every process, this one included, drops
+    its cached views when `sync_data_version()` runs at the start of the next
+    request.
+    """
+    result = db.session.execute(
+        update(DataVersion)
+        .where(DataVersion.id == DATA_VERSION_ID)
+        .values(version=DataVersion.version + 1, updated_at=datetime.utcnow())
+    )
+    if not result.rowcount:
+        view_cache.bump()
@@ -0,0 +1,175 @@
+"""
+    Local index of Comic Vine volumes, searchable by normalized title and year.
+
+    Every volume returned by a Comic Vine search is remembered here, so later
+    lookups of the same series (including noisy spellings such as "Action Comics "
+    or "The Flash" versus "Flash") resolve without another paginated search. The
+    index lives in the API cache database file (stdlib `sqlite3`, no Flask) and
+    survives restarts.
+
+    Search results are ranked by `rank_volumes`: an exact normalized title wins,
+    otherwise titles are compared with `difflib`. The start year must match
+    exactly; a volume that started a year off is a different series as far as
+    enrichment is concerned (relaunches often reuse the name), so it is never
+    picked automatically. The local index itself only answers exact matches (normalized title and start year); anything fuzzier is left to a
+    fresh search, which may find a better candidate than the ones seen so far.
+
+    Environment variables:
+        - COMIC_VINE_CACHE_PATH: Location of the database file shared with the
+          response cache.
+"""
+
+import difflib
+import os
+import sqlite3
+import threading
+import time
+
+from normalize import normalize_title
+
+# Minimum title similarity (0..1) for a search result to be considered a match
+FUZZY_CUTOFF = 0.8
+
+
+def _start_year(volume):
+    """Return a volume's start year as an int, or None if it is unknown."""
+    try:
+        return int(volume.get('start_year'))
+    except (TypeError, ValueError):
+        return None
+
+
+def rank_volumes(series_name, start_year, volumes, cutoff=FUZZY_CUTOFF):
+    """
+    Rank candidate volumes for a series name and start year.
+
+    Args:
+        series_name (str): The series name to match.
+        start_year (int): The year the series started.
+        volumes (iterable): Dicts with at least 'id', 'name' and 'start_year'.
+        cutoff (float): Minimum title similarity for a volume to be returned.
+
+    Returns:
+        list: (score, volume) tuples, best first, for volumes with exactly
+              `start_year`. A score of 1.0 means the normalized title matches
+              exactly too.
+    """
+    target = normalize_title(series_name)
+    start_year = int(start_year)
+    ranked = []
+    for volume in volumes:
+        year = _start_year(volume)
+        if year != start_year:
+            continue
+        title = normalize_title(volume.get('name'))
+        matcher = difflib.SequenceMatcher(None, target, title)
+        if title == target:
+            similarity = 1.0
+        elif matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+            continue
+        else:
+            similarity = matcher.ratio()
+        if similarity >= cutoff:
+            ranked.append((similarity, volume))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return ranked
+
+
+class VolumeIndex:
+    """
+    SQLite-backed index of volumes seen in Comic Vine search results.
+
+    The index is safe to share across threads; all access goes through a single
+    connection guarded by a lock.
+
+    Attributes:
+        path (str): Location of the database file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        """Open the database on first use and create the volumes table."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS volumes ('
+                ' id INTEGER PRIMARY KEY,'
+                ' name TEXT NOT NULL,'
+                ' normalized_name TEXT NOT NULL,'
+                ' start_year INTEGER NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_volumes_year_name ON volumes (start_year, normalized_name)')
+            self._conn = conn
+        return self._conn
+
+    def add(self, volumes):
+        """
+        Remember volumes from a search response.
+
+        Args:
+            volumes (iterable): Dicts with 'id', 'name' and 'start_year'; entries
+                without a name or a numeric start year are skipped.
+        """
+        now = time.time()
+        rows = [
+            (volume['id'], volume['name'], normalize_title(volume['name']), _start_year(volume), now)
+            for volume in volumes
+            if volume.get('id') and volume.get('name') and _start_year(volume) is not None
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._connection().executemany(
+                'INSERT OR REPLACE INTO volumes (id, name, normalized_name, start_year, updated_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+
+    def find(self, series_name, start_year):
+        """
+        Look up known volumes that exactly match a series name and start year.
+
+        Only the normalized title and the exact start year are matched; near
+        misses are not returned, so callers search Comic Vine for them instead.
+
+        Args:
+            series_name (str): The series name to match.
+            start_year (int): The year the series started.
+
+        Returns:
+            list: (score, volume) tuples, best first, as from `rank_volumes`.
+        """
+        start_year = int(start_year)
+        with self._lock:
+            rows = self._connection().execute(
+                'SELECT id, name, start_year FROM volumes WHERE start_year = ? AND normalized_name = ?',
+                (start_year, normalize_title(series_name))
+            ).fetchall()
+        volumes = [{'id': row[0], 'name': row[1], 'start_year': row[2]} for row in rows]
+        return rank_volumes(series_name, start_year, volumes)
+
+    def clear(self):
+        """Forget every volume."""
+        with self._lock:
+            self._connection().execute('DELETE FROM volumes')
+
+
+def volume_index_from_env():
+    """
+    Create the default volume index, stored next to the API response cache.
+
+    Returns:
+        VolumeIndex: The configured index.
+    """
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'comicvine_cache.db')
+    return VolumeIndex(os.getenv('COMIC_VINE_CACHE_PATH', default_path))